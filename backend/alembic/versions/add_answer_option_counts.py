@@ -0,0 +1,64 @@
+"""add answer option counts
+
+Revision ID: add_answer_option_counts
+Revises: add_import_jobs
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_answer_option_counts'
+down_revision: Union[str, None] = 'add_import_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    logger.info("Creating answer_option_counts table")
+    counts_table = op.create_table(
+        'answer_option_counts',
+        sa.Column('questionnaire_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('option', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('questionnaire_id', 'question_id', 'option')
+    )
+
+    # Backfill from existing MCQ answers (same logic as app.analytics.rebuild_option_counts)
+    logger.info("Backfilling option counts")
+    connection = op.get_bind()
+    answers = sa.table('answers', sa.column('response_id'), sa.column('question_id'), sa.column('value', sa.JSON))
+    responses = sa.table('responses', sa.column('id'), sa.column('questionnaire_id'))
+    questions = sa.table('questions', sa.column('id'), sa.column('type'))
+    result = connection.execution_options(yield_per=BATCH_SIZE).execute(
+        sa.select(responses.c.questionnaire_id, answers.c.question_id, answers.c.value)
+        .select_from(answers)
+        .join(responses, answers.c.response_id == responses.c.id)
+        .join(questions, answers.c.question_id == questions.c.id)
+        .where(questions.c.type == 'mcq')
+    )
+    counts = Counter()
+    for questionnaire_id, question_id, value in result:
+        for option in set(value or []):
+            counts[(questionnaire_id, question_id, option)] += 1
+    records = [
+        {'questionnaire_id': key[0], 'question_id': key[1], 'option': key[2], 'count': count}
+        for key, count in counts.items()
+    ]
+    for start in range(0, len(records), BATCH_SIZE):
+        op.bulk_insert(counts_table, records[start:start + BATCH_SIZE])
+    logger.info("Backfilled %d option counts", len(records))
+
+
+def downgrade() -> None:
+    op.drop_table('answer_option_counts')
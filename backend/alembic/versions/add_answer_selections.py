@@ -0,0 +1,71 @@
+"""add answer selections
+
+Revision ID: add_answer_selections
+Revises: add_answer_option_counts
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_answer_selections'
+down_revision: Union[str, None] = 'add_answer_option_counts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    logger.info("Creating answer_selections table")
+    selections_table = op.create_table(
+        'answer_selections',
+        sa.Column('answer_id', sa.String(), nullable=False),
+        sa.Column('option', sa.String(), nullable=False),
+        sa.Column('response_id', sa.String(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['answer_id'], ['answers.id'], ),
+        sa.ForeignKeyConstraint(['response_id'], ['responses.id'], ),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+        sa.PrimaryKeyConstraint('answer_id', 'option')
+    )
+
+    # Backfill one row per selected option of every existing MCQ answer
+    logger.info("Backfilling answer selections")
+    connection = op.get_bind()
+    answers = sa.table('answers', sa.column('id'), sa.column('response_id'), sa.column('question_id'), sa.column('value', sa.JSON))
+    questions = sa.table('questions', sa.column('id'), sa.column('type'))
+    result = connection.execution_options(yield_per=BATCH_SIZE).execute(
+        sa.select(answers.c.id, answers.c.response_id, answers.c.question_id, answers.c.value)
+        .select_from(answers)
+        .join(questions, answers.c.question_id == questions.c.id)
+        .where(questions.c.type == 'mcq')
+    )
+    written = 0
+    for batch in result.partitions():
+        records = [
+            {'answer_id': answer_id, 'option': option, 'response_id': response_id, 'question_id': question_id}
+            for answer_id, response_id, question_id, value in batch
+            for option in set(value or [])
+        ]
+        if records:
+            op.bulk_insert(selections_table, records)
+        written += len(records)
+    logger.info("Backfilled %d answer selections", written)
+
+    # Indexes after the backfill, so the bulk insert doesn't maintain them row by row
+    op.create_index('ix_answer_selections_option_question_id', 'answer_selections', ['option', 'question_id', 'response_id'])
+    op.create_index('ix_answer_selections_response_id', 'answer_selections', ['response_id'])
+    logger.info("Table created successfully")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answer_selections_response_id', table_name='answer_selections')
+    op.drop_index('ix_answer_selections_option_question_id', table_name='answer_selections')
+    op.drop_table('answer_selections')
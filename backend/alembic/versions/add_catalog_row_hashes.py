@@ -0,0 +1,35 @@
+"""add catalog row hashes
+
+Revision ID: add_catalog_row_hashes
+Revises: add_response_pagination_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_catalog_row_hashes'
+down_revision: Union[str, None] = 'add_response_pagination_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = ('questionnaires', 'questions', 'question_junctions')
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash and are rewritten once by the first catalog sync
+    logger.info("Adding row_hash to catalog tables")
+    for table in CATALOG_TABLES:
+        op.add_column(table, sa.Column('row_hash', sa.String(), nullable=True))
+    logger.info("Columns added successfully")
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.drop_column(table, 'row_hash')
@@ -0,0 +1,36 @@
+"""add catalog version
+
+Revision ID: add_catalog_version
+Revises: add_user_response_summaries
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_catalog_version'
+down_revision: Union[str, None] = 'add_user_response_summaries'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    logger.info("Creating catalog_version table")
+    version_table = op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(version_table, [{'id': 1, 'version': 1}])
+    logger.info("Catalog version table created successfully")
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_version')
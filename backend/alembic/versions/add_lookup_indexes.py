@@ -0,0 +1,38 @@
+"""add foreign key lookup indexes
+
+Revision ID: add_lookup_indexes
+Revises: add_answer_selections
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_lookup_indexes'
+down_revision: Union[str, None] = 'add_answer_selections'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # responses.user_id, responses.questionnaire_id and answers.response_id
+    # already lead the unique constraints and pagination indexes, so only the
+    # uncovered lookups get an index (see app/index_advisor.py)
+    logger.info("Creating foreign key lookup indexes")
+    op.create_index('ix_answers_question_id', 'answers', ['question_id'])
+    op.create_index('ix_question_junctions_questionnaire_id_priority', 'question_junctions', ['questionnaire_id', 'priority'])
+    op.create_index('ix_question_junctions_question_id', 'question_junctions', ['question_id'])
+    op.create_index('ix_answer_selections_question_id', 'answer_selections', ['question_id'])
+    logger.info("Indexes created successfully")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answer_selections_question_id', table_name='answer_selections')
+    op.drop_index('ix_question_junctions_question_id', table_name='question_junctions')
+    op.drop_index('ix_question_junctions_questionnaire_id_priority', table_name='question_junctions')
+    op.drop_index('ix_answers_question_id', table_name='answers')
@@ -0,0 +1,33 @@
+"""add response pagination indexes
+
+Revision ID: add_response_pagination_indexes
+Revises: add_missing_tables
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_response_pagination_indexes'
+down_revision: Union[str, None] = 'add_missing_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    logger.info("Creating keyset pagination indexes on responses")
+    op.create_index('ix_responses_created_at_id', 'responses', ['created_at', 'id'])
+    op.create_index('ix_responses_questionnaire_id_created_at_id', 'responses', ['questionnaire_id', 'created_at', 'id'])
+    op.create_index('ix_responses_user_id_created_at_id', 'responses', ['user_id', 'created_at', 'id'])
+    logger.info("Indexes created successfully")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_responses_user_id_created_at_id', table_name='responses')
+    op.drop_index('ix_responses_questionnaire_id_created_at_id', table_name='responses')
+    op.drop_index('ix_responses_created_at_id', table_name='responses')
@@ -0,0 +1,66 @@
+"""add user response summaries
+
+Revision ID: add_user_response_summaries
+Revises: add_lookup_indexes
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_response_summaries'
+down_revision: Union[str, None] = 'add_lookup_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    logger.info("Creating user_response_summaries table")
+    op.create_table(
+        'user_response_summaries',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('response_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('questionnaires_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_submission_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill one row per user (same logic as app.user_summaries.rebuild_user_summaries)
+    logger.info("Backfilling user response summaries")
+    connection = op.get_bind()
+    connection.execute(sa.text("""
+        INSERT INTO user_response_summaries (user_id, response_count, questionnaires_completed, last_submission_at)
+        SELECT users.id,
+               COUNT(responses.id),
+               COALESCE(SUM(CASE WHEN answered.answered >= questions.questions THEN 1 ELSE 0 END), 0),
+               MAX(responses.created_at)
+        FROM users
+        LEFT OUTER JOIN responses ON responses.user_id = users.id
+        LEFT OUTER JOIN (
+            SELECT response_id, COUNT(*) AS answered FROM answers GROUP BY response_id
+        ) AS answered ON answered.response_id = responses.id
+        LEFT OUTER JOIN (
+            SELECT questionnaire_id, COUNT(*) AS questions FROM question_junctions GROUP BY questionnaire_id
+        ) AS questions ON questions.questionnaire_id = responses.questionnaire_id
+        GROUP BY users.id
+    """))
+
+    logger.info("Creating user_response_summaries sort indexes")
+    op.create_index('ix_user_response_summaries_response_count_user_id', 'user_response_summaries', ['response_count', 'user_id'])
+    op.create_index('ix_user_response_summaries_questionnaires_completed_user_id', 'user_response_summaries', ['questionnaires_completed', 'user_id'])
+    op.create_index('ix_user_response_summaries_last_submission_at_user_id', 'user_response_summaries', ['last_submission_at', 'user_id'])
+    logger.info("User response summaries created successfully")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_response_summaries_last_submission_at_user_id', table_name='user_response_summaries')
+    op.drop_index('ix_user_response_summaries_questionnaires_completed_user_id', table_name='user_response_summaries')
+    op.drop_index('ix_user_response_summaries_response_count_user_id', table_name='user_response_summaries')
+    op.drop_table('user_response_summaries')
@@ -0,0 +1,144 @@
+import argparse
+import logging
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, delete, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .database import dialect_insert, engine
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_REBUILD_BATCH_SIZE = int(os.getenv("ANALYTICS_REBUILD_BATCH_SIZE", "5000"))
+
+# (questionnaire_id, question_id, option)
+OptionKey = Tuple[int, int, str]
+
+
+def option_keys(questionnaire_id: int, question_id: int, value) -> List[OptionKey]:
+    # A selection counts once per answer, however often the client repeated it
+    return [(questionnaire_id, question_id, option) for option in set(value or [])]
+
+
+def option_deltas(
+    questionnaire_id: int,
+    added: Iterable[Tuple[int, list]],
+    removed: Iterable[Tuple[int, list]] = (),
+) -> Counter:
+    """Net count change per option for answers (question_id, value) added/removed."""
+    deltas = Counter()
+    for question_id, value in added:
+        for key in option_keys(questionnaire_id, question_id, value):
+            deltas[key] += 1
+    for question_id, value in removed:
+        for key in option_keys(questionnaire_id, question_id, value):
+            deltas[key] -= 1
+    return deltas
+
+
+async def apply_option_deltas(db: AsyncSession, deltas: Counter) -> None:
+    """Apply count deltas on the caller's transaction.
+
+    Increments upsert so new options appear; decrements only update existing
+    rows, which also makes removed non-MCQ answers a no-op.
+    """
+    table = models.AnswerOptionCount.__table__
+    increments = [
+        {"questionnaire_id": key[0], "question_id": key[1], "option": key[2], "count": delta}
+        for key, delta in deltas.items() if delta > 0
+    ]
+    decrements = [
+        {"_questionnaire_id": key[0], "_question_id": key[1], "_option": key[2], "_delta": delta}
+        for key, delta in deltas.items() if delta < 0
+    ]
+    if increments:
+        stmt = dialect_insert(db.bind.dialect.name, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["questionnaire_id", "question_id", "option"],
+            set_={"count": table.c.count + stmt.excluded.count},
+        )
+        await db.execute(stmt, increments)
+    if decrements:
+        await db.execute(
+            update(table)
+            .where(and_(
+                table.c.questionnaire_id == bindparam("_questionnaire_id"),
+                table.c.question_id == bindparam("_question_id"),
+                table.c.option == bindparam("_option"),
+            ))
+            .values(count=table.c.count + bindparam("_delta")),
+            decrements,
+        )
+
+
+async def get_option_counts(
+    db: AsyncSession, questionnaire_id: int, question_id: Optional[int] = None
+) -> List[dict]:
+    """Option distribution per MCQ question, most selected first."""
+    counts = models.AnswerOptionCount
+    stmt = (
+        select(counts.question_id, counts.option, counts.count)
+        .where(counts.questionnaire_id == questionnaire_id, counts.count > 0)
+        .order_by(counts.question_id, counts.count.desc(), counts.option)
+    )
+    if question_id is not None:
+        stmt = stmt.where(counts.question_id == question_id)
+
+    questions: Dict[int, dict] = {}
+    for row_question_id, option, count in (await db.execute(stmt)).all():
+        question = questions.setdefault(
+            row_question_id, {"question_id": row_question_id, "selections": 0, "options": []}
+        )
+        question["selections"] += count
+        question["options"].append({"option": option, "count": count})
+    return list(questions.values())
+
+
+def rebuild_option_counts(batch_size: int = ANALYTICS_REBUILD_BATCH_SIZE) -> int:
+    """Recompute answer_option_counts from the answers table.
+
+    Answers are streamed `batch_size` rows at a time and aggregated in memory
+    (one entry per distinct option), then the table is replaced in one
+    transaction. Returns the number of count rows written.
+    """
+    models.Base.metadata.create_all(bind=engine)
+
+    answers, responses, questions = models.Answer, models.Response, models.Question
+    counts = Counter()
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Hold off concurrent submissions' deltas until the rebuilt table is
+            # committed; answers they already wrote are then seen by the scan.
+            connection.execute(text("LOCK TABLE answer_option_counts IN EXCLUSIVE MODE"))
+
+        result = connection.execution_options(yield_per=batch_size).execute(
+            select(responses.questionnaire_id, answers.question_id, answers.value)
+            .join(responses, answers.response_id == responses.id)
+            .join(questions, answers.question_id == questions.id)
+            .where(questions.type == "mcq")
+        )
+        scanned = 0
+        for batch in result.partitions():
+            for questionnaire_id, question_id, value in batch:
+                counts.update(option_keys(questionnaire_id, question_id, value))
+            scanned += len(batch)
+            logger.info("Scanned %d answers", scanned)
+
+        connection.execute(delete(models.AnswerOptionCount))
+        records = [
+            {"questionnaire_id": key[0], "question_id": key[1], "option": key[2], "count": count}
+            for key, count in counts.items()
+        ]
+        for start in range(0, len(records), batch_size):
+            connection.execute(insert(models.AnswerOptionCount), records[start:start + batch_size])
+
+    logger.info("Rebuilt %d option counts", len(records))
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the MCQ option counts from stored answers")
+    parser.add_argument("--batch-size", type=int, default=ANALYTICS_REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+    print(f"Rebuilt {rebuild_option_counts(batch_size=args.batch_size)} option counts")
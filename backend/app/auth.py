@@ -4,9 +4,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from . import models, schemas
-from .database import SessionLocal
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, replica, schemas
+from .cache import invalidate_user_cache, user_cache
+from .database import AsyncSessionLocal
+from .hashing import PasswordHasher
+from .metrics import observe_password_hash
 import os
 import logging
 
@@ -15,46 +19,72 @@ logger = logging.getLogger(__name__)
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=int(os.getenv("BCRYPT_MAX_WORKERS", "2")),
+    max_queue=int(os.getenv("BCRYPT_MAX_QUEUE", "32")),
+    observer=observe_password_hash,
+)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-here")
-logger.info(f"Using JWT secret key: {'default' if SECRET_KEY == 'your-secret-key-here' else 'custom'}")
+if SECRET_KEY == "your-secret-key-here":
+    logger.warning("Using the default JWT secret key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def verify_password(plain_password: str, hashed_password: str):
-    logger.info("Verifying password")
-    result = pwd_context.verify(plain_password, hashed_password)
-    logger.info(f"Password verification result: {result}")
-    return result
+async def get_read_db():
+    # Read-only routes; may see data up to REPLICA_MAX_LAG_SECONDS old
+    async with replica.read_session() as db:
+        yield db
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, username: str, password: str):
-    logger.info(f"Attempting to authenticate user: {username}")
-    user = db.query(models.User).filter(models.User.username == username).first()
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str):
+    return await password_hasher.hash(password)
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
     if not user:
-        logger.error(f"User not found: {username}")
+        logger.debug("User not found: %s", username)
         return False
-    logger.info(f"User found: {username}")
-    logger.info(f"Stored hashed password: {user.password}")
-    if not verify_password(password, user.password):
-        logger.error(f"Invalid password for user: {username}")
+    if not await verify_password_async(password, user.password):
+        logger.debug("Invalid password for user: %s", username)
         return False
-    logger.info(f"Password verified for user: {username}")
     return user
 
+# Revocation hooks: drop cached principals whenever a user row changes
+@event.listens_for(models.User, "after_insert")
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _evict_cached_user(mapper, connection, target):
+    invalidate_user_cache(target.username)
+    for previous_username in inspect(target).attrs.username.history.deleted:
+        invalidate_user_cache(previous_username)
+
+def token_claims(user: models.User) -> dict:
+    return {"sub": user.username, "uid": user.id}
+
+def cache_user(user: models.User) -> schemas.User:
+    principal = schemas.User.model_validate(user, from_attributes=True)
+    user_cache.set(principal.username, principal)
+    return principal
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -62,33 +92,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    logger.info(f"Creating access token with data: {to_encode}")
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    logger.info("Getting current user")
+def decode_token(token: str) -> Optional[schemas.TokenData]:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        logger.debug("Invalid JWT token")
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return schemas.TokenData(username=username, user_id=payload.get("uid"))
+
+async def resolve_principal(db: AsyncSession, token_data: schemas.TokenData) -> Optional[schemas.User]:
+    """The user a decoded token belongs to, or None if it no longer exists."""
+    # Fast path: resolve from the in-process cache without touching the database.
+    # Admins are always re-read: eviction only reaches this worker and misses
+    # Core/bulk updates, so a cached admin could outlive a demotion or deletion.
+    principal = user_cache.get(token_data.username)
+    if principal is None or principal.is_admin:
+        user = await get_user_by_username(db, token_data.username)
+        if user is None:
+            logger.debug("User not found: %s", token_data.username)
+            return None
+        principal = cache_user(user)
+    
+    # Reject tokens issued to a different user that held the same username
+    if token_data.user_id is not None and principal.id != token_data.user_id:
+        return None
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(username=username)
-    except JWTError:
-        logger.error("Invalid JWT token")
+    token_data = decode_token(token)
+    if token_data is None:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
-    if user is None:
-        logger.error(f"User not found: {token_data.username}")
+    principal = await resolve_principal(db, token_data)
+    if principal is None:
         raise credentials_exception
-    logger.info(f"Current user: {user.username}")
-    return user
+    return principal
 
 async def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
-    logger.info("Getting current active user")
     return current_user
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe, bounded LRU cache whose entries expire after `ttl` seconds.
+
+    A `ttl` of 0 (or less) disables expiry, so entries live until they are
+    evicted or explicitly invalidated.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionCheck:
+    """Last version seen of a counter shared through the database, re-read at
+    most every `interval` seconds per process."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.version: Optional[int] = None
+        self._checked_at = float("-inf")
+
+    def due(self) -> bool:
+        if time.monotonic() - self._checked_at < self.interval:
+            return False
+        # Claimed before the read, so concurrent requests don't all re-check
+        self._checked_at = time.monotonic()
+        return True
+
+    def changed(self, version: Optional[int]) -> bool:
+        """Record `version`; True if it differs from the one seen before."""
+        changed = self.version is not None and version != self.version
+        self.version = version
+        return changed
+
+
+QUESTIONNAIRE_LIST_KEY = "list"
+
+# Serialized GET /questionnaires/{id} payloads and their ETags, keyed by
+# questionnaire id; the GET /questionnaires/ list lives under QUESTIONNAIRE_LIST_KEY.
+# import_data() and catalog sync clear it in the worker that ran them; the
+# other workers notice the bumped catalog_version row within
+# CATALOG_VERSION_CHECK_SECONDS (see queries.refresh_catalog_cache). The TTL
+# is only a backstop for catalog edits made outside those paths.
+questionnaire_cache = TTLCache(
+    maxsize=int(os.getenv("QUESTIONNAIRE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("QUESTIONNAIRE_CACHE_TTL_SECONDS", "300")),
+)
+catalog_version_check = VersionCheck(float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "2")))
+
+# Resolved users for authenticated requests, keyed by JWT subject (username).
+# Entries are evicted when a user row changes through the ORM, but only in the
+# worker that made the change. Admins are re-read on every request (see
+# auth.get_current_user), so the TTL only bounds how long another worker keeps
+# accepting a deleted non-admin user.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def invalidate_catalog_caches() -> None:
+    questionnaire_cache.clear()
+
+
+def invalidate_user_cache(username: Optional[str] = None) -> None:
+    if username is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate(username)
@@ -0,0 +1,166 @@
+import argparse
+import json
+import logging
+from typing import Dict, List, Set
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from . import models
+from .cache import QUESTIONNAIRE_LIST_KEY, questionnaire_cache
+from .database import engine
+from .replica import hold_primary
+from .import_data import (
+    IMPORT_CHUNK_SIZE,
+    bump_catalog_version,
+    junction_records,
+    question_records,
+    questionnaire_records,
+    read_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+# Parents before children, so inserts/updates satisfy foreign keys
+CATALOG_TABLES = [
+    ("questionnaires", models.Questionnaire, "questionnaire_questionnaires.csv", questionnaire_records),
+    ("questions", models.Question, "questionnaire_questions.csv", question_records),
+    ("question_junctions", models.QuestionJunction, "questionnaire_junction.csv", junction_records),
+]
+
+
+def read_catalog(filename: str, to_records, chunk_size: int) -> Dict[int, dict]:
+    records = {}
+    for chunk in read_chunks(filename, chunk_size):
+        for record in to_records(chunk):
+            records[record["id"]] = record
+    return records
+
+
+def stored_hashes(connection: Connection, model) -> Dict[int, str]:
+    return dict(connection.execute(select(model.id, model.row_hash)).all())
+
+
+def referenced_ids(connection: Connection, column, ids: Set[int]) -> Set[int]:
+    if not ids:
+        return set()
+    return set(connection.execute(select(column).where(column.in_(ids)).distinct()).scalars())
+
+
+def diff_table(incoming: Dict[int, dict], stored: Dict[int, str]) -> dict:
+    return {
+        "insert": sorted(set(incoming) - set(stored)),
+        "update": sorted(
+            record_id for record_id, record in incoming.items()
+            if record_id in stored and stored[record_id] != record["row_hash"]
+        ),
+        "delete": sorted(set(stored) - set(incoming)),
+        "blocked": [],
+    }
+
+
+def apply_upserts(connection: Connection, model, incoming: Dict[int, dict], changes: dict) -> None:
+    table = model.__table__
+    if changes["insert"]:
+        connection.execute(insert(table), [incoming[record_id] for record_id in changes["insert"]])
+    if changes["update"]:
+        # Bind names must not clash with the SET column names
+        columns = [column for column in incoming[changes["update"][0]] if column != "id"]
+        values = {column: bindparam(f"_{column}") for column in columns}
+        values["updated_at"] = func.now()
+        connection.execute(
+            update(table).where(table.c.id == bindparam("_id")).values(values),
+            [
+                {f"_{column}": record[column] for column in ("id", *columns)}
+                for record in (incoming[record_id] for record_id in changes["update"])
+            ],
+        )
+
+
+def apply_deletes(connection: Connection, model, ids: List[int]) -> None:
+    if ids:
+        connection.execute(delete(model).where(model.id.in_(ids)))
+
+
+def sync_catalog(dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """Apply only the catalog rows that differ from the CSVs.
+
+    Rows are matched by id and compared by the content hash stored in
+    `row_hash`. Users, responses and answers are never touched; questions and
+    questionnaires still referenced by answers/responses are reported as
+    `blocked` instead of being deleted.
+    """
+    models.Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        incoming = {}
+        report = {}
+        for name, model, filename, to_records in CATALOG_TABLES:
+            incoming[name] = read_catalog(filename, to_records, chunk_size)
+            report[name] = diff_table(incoming[name], stored_hashes(connection, model))
+
+        # Keep catalog rows that patient data still points at
+        for name, column in (("questionnaires", models.Response.questionnaire_id),
+                             ("questions", models.Answer.question_id)):
+            blocked = referenced_ids(connection, column, set(report[name]["delete"]))
+            report[name]["blocked"] = sorted(blocked)
+            report[name]["delete"] = [record_id for record_id in report[name]["delete"] if record_id not in blocked]
+
+        affected = affected_questionnaires(connection, incoming, report)
+
+        if not dry_run:
+            junctions = models.QuestionJunction
+            apply_upserts(connection, models.Questionnaire, incoming["questionnaires"], report["questionnaires"])
+            apply_upserts(connection, models.Question, incoming["questions"], report["questions"])
+            # Junctions first on delete so questions/questionnaires can follow
+            apply_deletes(connection, junctions, report["question_junctions"]["delete"])
+            if report["questions"]["delete"] or report["questionnaires"]["delete"]:
+                connection.execute(
+                    delete(junctions).where(
+                        junctions.question_id.in_(report["questions"]["delete"])
+                        | junctions.questionnaire_id.in_(report["questionnaires"]["delete"])
+                    )
+                )
+            apply_upserts(connection, junctions, incoming["question_junctions"], report["question_junctions"])
+            apply_deletes(connection, models.Question, report["questions"]["delete"])
+            apply_deletes(connection, models.Questionnaire, report["questionnaires"]["delete"])
+            if affected:
+                bump_catalog_version(connection)
+
+    if not dry_run:
+        for questionnaire_id in affected:
+            questionnaire_cache.invalidate(questionnaire_id)
+        if any(report["questionnaires"][kind] for kind in ("insert", "update", "delete")):
+            questionnaire_cache.invalidate(QUESTIONNAIRE_LIST_KEY)
+        # Until the replica has the new catalog, refill the caches from the primary
+        hold_primary()
+
+    changed = sum(len(changes[kind]) for changes in report.values() for kind in ("insert", "update", "delete"))
+    logger.info("Catalog sync %s: %d changes", "dry run" if dry_run else "applied", changed)
+    return {"dry_run": dry_run, "changes": changed, "affected_questionnaires": sorted(affected), **report}
+
+
+def affected_questionnaires(connection: Connection, incoming: Dict[str, Dict[int, dict]], report: dict) -> Set[int]:
+    """Questionnaire ids whose served payload changes with this sync."""
+    affected = set()
+    for kind in ("insert", "update", "delete"):
+        affected.update(report["questionnaires"][kind])
+
+    junctions = models.QuestionJunction
+    changed_junctions = set(report["question_junctions"]["update"]) | set(report["question_junctions"]["delete"])
+    changed_questions = set(report["questions"]["update"]) | set(report["questions"]["delete"])
+    if changed_junctions or changed_questions:
+        affected.update(connection.execute(
+            select(junctions.questionnaire_id)
+            .where(junctions.id.in_(changed_junctions) | junctions.question_id.in_(changed_questions))
+            .distinct()
+        ).scalars())
+    for junction_id in report["question_junctions"]["insert"] + report["question_junctions"]["update"]:
+        affected.add(incoming["question_junctions"][junction_id]["questionnaire_id"])
+    return affected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the questionnaire catalog with the CSVs")
+    parser.add_argument("--dry-run", action="store_true", help="Report the diff without writing")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(sync_catalog(dry_run=args.dry_run, chunk_size=args.chunk_size), indent=2))
@@ -0,0 +1,173 @@
+import gzip
+import os
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_TYPES = {
+    media_type.strip()
+    for media_type in os.getenv(
+        "COMPRESSION_TYPES", "application/json,application/x-ndjson,text/csv,text/plain,text/html"
+    ).split(",")
+    if media_type.strip()
+}
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Server preference order; brotli is dropped when the module isn't installed
+ENCODINGS = [
+    encoding.strip()
+    for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",")
+    if encoding.strip() == "gzip" or (encoding.strip() == "br" and brotli is not None)
+]
+
+# Cached bodies are compressed once, so they can afford the slowest settings
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 11
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding for an Accept-Encoding header, or None."""
+    if not accept_encoding or not ENCODINGS:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(media_type: Optional[str], size: Optional[int] = None) -> bool:
+    if not media_type or media_type.split(";")[0].strip().lower() not in COMPRESSION_TYPES:
+        return False
+    return size is None or size >= COMPRESSION_MIN_SIZE
+
+
+def compress(payload: bytes, encoding: str, precompress: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(
+            payload, quality=PRECOMPRESSED_BROTLI_QUALITY if precompress else COMPRESSION_BROTLI_QUALITY
+        )
+    return gzip.compress(
+        payload, compresslevel=PRECOMPRESSED_GZIP_LEVEL if precompress else COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    # Each representation gets its own strong validator: "abc" -> "abc-gzip"
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def add_vary(headers: MutableHeaders, value: str) -> None:
+    existing = [item.strip().lower() for item in headers.get("vary", "").split(",") if item.strip()]
+    if value.lower() not in existing:
+        headers["Vary"] = f"{headers['vary']}, {value}" if existing else value
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Flush every chunk so streamed exports reach the client as they are produced
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress allow-listed response types with the client's preferred encoding.
+
+    Bodies below COMPRESSION_MIN_SIZE and responses that already carry a
+    Content-Encoding (e.g. precompressed cache entries) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        start_message: Optional[Message] = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if compressor is not None:
+                body = compressor.compress(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body += compressor.finish()
+                await send({**message, "body": body})
+                return
+
+            # First body message: decide now that the start and body size are known
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            compressible = (
+                start_message["status"] not in (204, 304)
+                and "content-encoding" not in headers
+                and is_compressible(headers.get("content-type"))
+            )
+            if compressible:
+                add_vary(headers, "Accept-Encoding")
+            if not compressible or encoding is None or (not more_body and len(body) < COMPRESSION_MIN_SIZE):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            if more_body:
+                compressor = _StreamCompressor(encoding)
+                del headers["content-length"]
+                body = compressor.compress(body)
+            else:
+                body = compress(body, encoding)
+                headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,14 @@
 from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,14 +19,155 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "sqlite:///./sql_app.db"
 )
 
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver (asyncpg/aiosqlite)."""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if parsed.get_backend_name() == "postgresql":
+        query = dict(parsed.query)
+        # asyncpg takes "ssl" where libpq takes "sslmode"
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+    return url
+
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    to_async_url(SQLALCHEMY_DATABASE_URL)
+)
+
+# Optional streaming replica for read-only routes (see replica.py)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+ASYNC_DATABASE_REPLICA_URL = os.getenv(
+    "ASYNC_DATABASE_REPLICA_URL",
+    to_async_url(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+)
+
+# Connection pool settings (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+class PoolStats:
+    """Cumulative checkout counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+pool_stats = {"sync": PoolStats(), "async": PoolStats(), "replica": PoolStats()}
+
+def instrumented_pool(pool_class, stats: PoolStats):
+    """Subclass `pool_class` so every checkout records how long it waited."""
+
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except sa_exc.TimeoutError:
+                stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+def pool_options(pool_class, stats: PoolStats) -> dict:
+    return {
+        "poolclass": instrumented_pool(pool_class, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 # Create engine with the appropriate settings for either SQLite or PostgreSQL
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
     )
 else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(QueuePool, pool_stats["sync"]))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the FastAPI routes so DB round trips don't block the event loop.
+# The sync engine above is kept for import_data(), migrations and scripts.
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **pool_options(AsyncAdaptedQueuePool, pool_stats["async"])
+    )
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+if ASYNC_DATABASE_REPLICA_URL is None:
+    replica_async_engine = None
+    ReplicaSessionLocal = None
+else:
+    if ASYNC_DATABASE_REPLICA_URL.startswith("sqlite"):
+        replica_async_engine = create_async_engine(ASYNC_DATABASE_REPLICA_URL)
+    else:
+        replica_async_engine = create_async_engine(
+            ASYNC_DATABASE_REPLICA_URL, **pool_options(AsyncAdaptedQueuePool, pool_stats["replica"])
+        )
+    ReplicaSessionLocal = async_sessionmaker(
+        replica_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+def pool_status() -> dict:
+    """Current pool occupancy plus cumulative checkout waits for every engine."""
+    status = {}
+    pools = [("sync", engine.pool), ("async", async_engine.sync_engine.pool)]
+    if replica_async_engine is not None:
+        pools.append(("replica", replica_async_engine.sync_engine.pool))
+    for name, pool in pools:
+        status[name] = {
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+            **pool_stats[name].snapshot(),
+        }
+    return status
+
+def dialect_insert(dialect_name: str, model):
+    """INSERT construct with ON CONFLICT support for the backing database."""
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 Base = declarative_base()
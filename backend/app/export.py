@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator
+from sqlalchemy import select
+from . import models
+from .replica import read_session
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = [
+    "response_id",
+    "submitted_at",
+    "questionnaire_name",
+    "username",
+    "question",
+    "answer",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_statement():
+    return (
+        select(
+            models.Response.id,
+            models.Response.created_at,
+            models.Questionnaire.name,
+            models.User.username,
+            models.Question.question,
+            models.Answer.value,
+        )
+        .join(models.Questionnaire, models.Response.questionnaire_id == models.Questionnaire.id)
+        .join(models.User, models.Response.user_id == models.User.id)
+        .join(models.Answer, models.Answer.response_id == models.Response.id)
+        .join(models.Question, models.Answer.question_id == models.Question.id)
+        .order_by(models.Response.id, models.Answer.question_id)
+    )
+
+
+async def iter_export_batches(batch_size: int = EXPORT_BATCH_SIZE):
+    # Own session: the stream outlives the request handler. yield_per makes the
+    # driver use a server-side cursor, so only one batch is held in memory.
+    async with read_session() as db:
+        result = await db.stream(export_statement().execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+
+async def iter_csv(batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    async for batch in iter_export_batches(batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for response_id, submitted_at, questionnaire_name, username, question, value in batch:
+            writer.writerow([
+                response_id,
+                submitted_at.isoformat() if submitted_at else "",
+                questionnaire_name,
+                username,
+                question,
+                json.dumps(value),
+            ])
+        yield buffer.getvalue()
+
+
+async def iter_ndjson(batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    async for batch in iter_export_batches(batch_size):
+        lines = []
+        for response_id, submitted_at, questionnaire_name, username, question, value in batch:
+            lines.append(json.dumps({
+                "response_id": response_id,
+                "submitted_at": submitted_at.isoformat() if submitted_at else None,
+                "questionnaire_name": questionnaire_name,
+                "username": username,
+                "question": question,
+                "answer": value,
+            }) + "\n")
+        yield "".join(lines)
+
+
+def iter_export(format: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    if format == "csv":
+        return iter_csv(batch_size)
+    return iter_ndjson(batch_size)
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from passlib.context import CryptContext
+
+
+class HashingBusyError(RuntimeError):
+    pass
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a bounded thread pool.
+
+    The bcrypt extension releases the GIL while hashing, so worker threads run
+    in parallel and the event loop stays responsive. At most
+    `max_workers + max_queue` operations may be pending; beyond that callers
+    get HashingBusyError instead of queueing indefinitely. `observer`, if
+    given, is called with (operation, hash_seconds, wait_seconds) after each
+    completed operation.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext,
+        max_workers: int = 2,
+        max_queue: int = 32,
+        observer: Optional[Callable[[str, float, float], None]] = None,
+    ):
+        self.context = context
+        self.observer = observer
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def _run(self, operation: str, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HashingBusyError("Password hashing queue is full")
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            future = self._executor.submit(_timed, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the executor is done with the job, not when this
+        # coroutine stops waiting: a cancelled caller (client disconnect,
+        # timeout) leaves a running job behind that still occupies a worker
+        future.add_done_callback(self._release)
+        result, hash_seconds = await asyncio.wrap_future(future)
+        wait_seconds = time.perf_counter() - start - hash_seconds
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds_total += hash_seconds
+            self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        if self.observer is not None:
+            self.observer(operation, hash_seconds, wait_seconds)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", self.context.verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self.pending, self.max_workers),
+                "queue_depth": max(self.pending - self.max_workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_seconds_total": self.hash_seconds_total,
+                "hash_seconds_max": self.hash_seconds_max,
+                "hash_seconds_avg": self.hash_seconds_total / self.completed if self.completed else 0.0,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
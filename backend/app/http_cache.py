@@ -0,0 +1,70 @@
+import hashlib
+import os
+from typing import Dict
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from . import compression
+
+QUESTIONNAIRE_MAX_AGE_SECONDS = int(os.getenv("QUESTIONNAIRE_MAX_AGE_SECONDS", "60"))
+
+# Responses are per-user (bearer auth), so only the browser may cache them.
+# The catalog tolerates a short max-age; the user principal always revalidates.
+CATALOG_CACHE_CONTROL = f"private, max-age={QUESTIONNAIRE_MAX_AGE_SECONDS}"
+USER_CACHE_CONTROL = "private, no-cache"
+
+
+class CachedBody:
+    """Serialized body plus its ETag; compressed variants are built once, on first use."""
+
+    def __init__(self, payload: bytes, etag: str):
+        self.payload = payload
+        self.etag = etag
+        self._encoded: Dict[str, bytes] = {}
+
+    async def encoded(self, encoding: str) -> bytes:
+        if encoding not in self._encoded:
+            # Precompression uses the slowest settings; keep it off the event loop
+            self._encoded[encoding] = await run_in_threadpool(
+                compression.compress, self.payload, encoding, precompress=True
+            )
+        return self._encoded[encoding]
+
+
+def make_etag(payload: bytes) -> str:
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+def cached_body(payload: bytes) -> CachedBody:
+    return CachedBody(payload, make_etag(payload))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+async def conditional_response(
+    request: Request, body: CachedBody, cache_control: str, media_type: str = "application/json"
+) -> Response:
+    encoding = None
+    vary = "Authorization"
+    if compression.is_compressible(media_type):
+        vary += ", Accept-Encoding"
+        if compression.is_compressible(media_type, len(body.payload)):
+            encoding = compression.negotiate(request.headers.get("accept-encoding"))
+    etag = compression.encoded_etag(body.etag, encoding) if encoding else body.etag
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": vary}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        # Served from the cached variant; the compression middleware skips encoded bodies
+        headers["Content-Encoding"] = encoding
+        return Response(content=await body.encoded(encoding), media_type=media_type, headers=headers)
+    return Response(content=body.payload, media_type=media_type, headers=headers)
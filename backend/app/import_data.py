@@ -1,74 +1,205 @@
 import pandas as pd
+import argparse
+import csv
+import hashlib
+import io
 import json
+import logging
+import os
 import uuid
-from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Connection
 from . import models
-from .database import SessionLocal, engine
+from .database import dialect_insert, engine
+from .cache import invalidate_catalog_caches, invalidate_user_cache
+from .replica import hold_primary
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.getenv("IMPORT_DATA_DIR", "../data")
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+IMPORT_USE_COPY = os.getenv("IMPORT_USE_COPY", "true").lower() in ("1", "true", "yes")
+
+ProgressCallback = Callable[[str, int], None]
+
+# Columns that define a catalog row's content, used for change detection
+HASHED_COLUMNS = {
+    "questionnaires": ["id", "name"],
+    "questions": ["id", "type", "options", "question"],
+    "question_junctions": ["id", "questionnaire_id", "question_id", "priority"],
+}
+
+
+def log_progress(table: str, rows: int) -> None:
+    logger.info("Imported %d rows into %s", rows, table)
+
+
+def read_chunks(filename: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    return pd.read_csv(os.path.join(DATA_DIR, filename), chunksize=chunk_size)
+
+
+def row_hash(table_name: str, record: dict) -> str:
+    values = [record[column] for column in HASHED_COLUMNS[table_name]]
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def with_row_hashes(table_name: str, records: List[dict]) -> List[dict]:
+    for record in records:
+        record["row_hash"] = row_hash(table_name, record)
+    return records
+
+
+def questionnaire_records(chunk: pd.DataFrame) -> List[dict]:
+    return with_row_hashes("questionnaires", chunk[["id", "name"]].to_dict("records"))
+
+
+def question_records(chunk: pd.DataFrame) -> List[dict]:
+    # Decode the whole chunk's question JSON with a single json.loads call
+    decoded = json.loads("[" + ",".join(chunk["question"]) + "]")
+    return with_row_hashes("questions", [
+        {
+            "id": question_id,
+            "type": question["type"],
+            "options": question.get("options", []),
+            "question": question["question"],
+        }
+        for question_id, question in zip(chunk["id"].tolist(), decoded)
+    ])
+
+
+def junction_records(chunk: pd.DataFrame) -> List[dict]:
+    return with_row_hashes(
+        "question_junctions",
+        chunk[["id", "question_id", "questionnaire_id", "priority"]].to_dict("records"),
+    )
+
+
+def use_copy(connection: Connection) -> bool:
+    return (
+        IMPORT_USE_COPY
+        and connection.dialect.name == "postgresql"
+        and connection.dialect.driver == "psycopg2"
+    )
+
+
+def copy_records(connection: Connection, table, records: List[dict]) -> None:
+    """Stream records into `table` with Postgres COPY on the current transaction."""
+    columns = list(records[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([
+            json.dumps(record[column]) if isinstance(record[column], (list, dict)) else record[column]
+            for column in columns
+        ])
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def write_records(connection: Connection, table, records: List[dict]) -> None:
+    if not records:
+        return
+    if use_copy(connection):
+        copy_records(connection, table, records)
+    else:
+        connection.execute(insert(table), records)
+
+
+def load_table(
+    connection: Connection,
+    table,
+    chunks: Iterable[pd.DataFrame],
+    to_records: Callable[[pd.DataFrame], List[dict]],
+    progress: ProgressCallback,
+) -> int:
+    rows = 0
+    for chunk in chunks:
+        records = to_records(chunk)
+        write_records(connection, table, records)
+        rows += len(records)
+        progress(table.name, rows)
+    return rows
+
+
+def bump_catalog_version(connection: Connection) -> None:
+    # Call inside the transaction that rewrites the catalog, so the new version
+    # is visible exactly when the new rows are (see queries.refresh_catalog_cache)
+    table = models.CatalogVersion.__table__
+    stmt = dialect_insert(connection.dialect.name, table).values(id=1, version=1)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["id"], set_={"version": table.c.version + 1}
+    ))
+
+
+def import_data(
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
+    progress = progress or log_progress
 
-def import_data():
     # Create tables
     models.Base.metadata.create_all(bind=engine)
-    
-    db = SessionLocal()
+
     try:
-        # Clear existing data
-        db.query(models.Answer).delete()
-        db.query(models.Response).delete()
-        db.query(models.QuestionJunction).delete()
-        db.query(models.Question).delete()
-        db.query(models.Questionnaire).delete()
-        db.query(models.User).delete()
-        
-        # Import questionnaires
-        questionnaires_df = pd.read_csv('../data/questionnaire_questionnaires.csv')
-        for _, row in questionnaires_df.iterrows():
-            questionnaire = models.Questionnaire(
-                id=row['id'],
-                name=row['name']
-            )
-            db.add(questionnaire)
-        
-        # Import questions
-        questions_df = pd.read_csv('../data/questionnaire_questions.csv')
-        for _, row in questions_df.iterrows():
-            question_data = json.loads(row['question'])
-            question = models.Question(
-                id=row['id'],
-                type=question_data['type'],
-                options=question_data.get('options', []),
-                question=question_data['question']
-            )
-            db.add(question)
-        
-        # Import junctions
-        junctions_df = pd.read_csv('../data/questionnaire_junction.csv')
-        for _, row in junctions_df.iterrows():
-            junction = models.QuestionJunction(
-                id=row['id'],
-                question_id=row['question_id'],
-                questionnaire_id=row['questionnaire_id'],
-                priority=row['priority']
-            )
-            db.add(junction)
-        
-        # Create admin user
-        admin = models.User(
-            id=str(uuid.uuid4()),
-            username='admin',
-            password='admin123',  # In production, this should be hashed
-            is_admin=True
-        )
-        db.add(admin)
-        
-        db.commit()
+        # One transaction, so a failed import never leaves a half-wiped catalog.
+        # Chunking bounds memory and statement size, not transaction length.
+        with engine.begin() as connection:
+            # Clear existing data
+            for model in (models.AnswerOptionCount, models.AnswerSelection, models.Answer, models.Response,
+                          models.QuestionJunction, models.Question, models.Questionnaire,
+                          models.UserResponseSummary, models.User):
+                connection.execute(delete(model))
+
+            counts = {
+                "questionnaires": load_table(
+                    connection, models.Questionnaire.__table__,
+                    read_chunks("questionnaire_questionnaires.csv", chunk_size),
+                    questionnaire_records, progress,
+                ),
+                "questions": load_table(
+                    connection, models.Question.__table__,
+                    read_chunks("questionnaire_questions.csv", chunk_size),
+                    question_records, progress,
+                ),
+                "question_junctions": load_table(
+                    connection, models.QuestionJunction.__table__,
+                    read_chunks("questionnaire_junction.csv", chunk_size),
+                    junction_records, progress,
+                ),
+            }
+
+            # Create admin user
+            admin_id = str(uuid.uuid4())
+            connection.execute(insert(models.User.__table__), [{
+                "id": admin_id,
+                "username": "admin",
+                "password": "admin123",  # In production, this should be hashed
+                "is_admin": True,
+            }])
+            connection.execute(insert(models.UserResponseSummary.__table__), [{"user_id": admin_id}])
+            bump_catalog_version(connection)
+
+        invalidate_catalog_caches()
+        invalidate_user_cache()
+        hold_primary()
         print("Data import completed successfully")
-        
+        return counts
+
     except Exception as e:
         print(f"Error importing data: {e}")
-        db.rollback()
         raise
-    finally:
-        db.close()
+
 
 if __name__ == "__main__":
-    import_data()
+    parser = argparse.ArgumentParser(description="Import the questionnaire catalog from CSV")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    import_data(chunk_size=args.chunk_size, progress=lambda table, rows: print(f"{table}: {rows} rows"))
@@ -0,0 +1,91 @@
+import argparse
+import sys
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import inspect
+from .database import engine
+
+# (table, columns, where the lookup happens). A lookup is served when some
+# index, unique constraint or primary key starts with these columns.
+QUERY_PATTERNS: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("users", ("username",), "POST /token, GET /admin/user-responses/{username}, GET /admin/user-responses?sort=username"),
+    ("question_junctions", ("questionnaire_id", "priority"), "GET /questionnaires/{questionnaire_id}, POST /responses/"),
+    ("question_junctions", ("question_id",), "POST /admin/sync-catalog question deletes"),
+    ("responses", ("user_id",), "GET /admin/user-responses?questionnaire_id=, GET /admin/user-responses/{username}"),
+    ("responses", ("questionnaire_id",), "GET /admin/responses/?questionnaire_id=, POST /admin/sync-catalog"),
+    ("responses", ("created_at", "id"), "GET /admin/responses/ keyset pagination"),
+    ("answers", ("response_id",), "GET /admin/user-responses/{username}, POST /responses/ replacement"),
+    ("answers", ("question_id",), "GET /admin/user-responses/{username}, POST /admin/sync-catalog"),
+    ("answer_selections", ("option", "question_id"), "GET /admin/responses/search"),
+    ("answer_selections", ("response_id",), "POST /responses/ replacement"),
+    ("user_response_summaries", ("response_count", "user_id"), "GET /admin/user-responses?sort=response_count"),
+    ("user_response_summaries", ("questionnaires_completed", "user_id"), "GET /admin/user-responses?sort=questionnaires_completed"),
+    # Both halves of the keyset order: submitters newest first, then IS NULL by user id
+    ("user_response_summaries", ("last_submission_at", "user_id"), "GET /admin/user-responses?sort=last_submission_at"),
+    ("import_jobs", ("status",), "job recovery on startup"),
+]
+
+
+def index_prefixes(inspector, table: str) -> Dict[Tuple[str, ...], str]:
+    """Column lists that can serve lookups on `table`, mapped to the index providing them."""
+    prefixes = {}
+    primary_key = inspector.get_pk_constraint(table)
+    if primary_key["constrained_columns"]:
+        prefixes[tuple(primary_key["constrained_columns"])] = primary_key.get("name") or f"{table}_pkey"
+    for constraint in inspector.get_unique_constraints(table):
+        # SQLite reports unnamed constraints (backed by its autoindexes)
+        prefixes[tuple(constraint["column_names"])] = constraint["name"] or f"unique ({', '.join(constraint['column_names'])})"
+    for index in inspector.get_indexes(table):
+        prefixes[tuple(index["column_names"])] = index["name"]
+    return prefixes
+
+
+def covering_index(prefixes: Dict[Tuple[str, ...], str], columns: Sequence[str]):
+    for indexed, name in prefixes.items():
+        if indexed[:len(columns)] == tuple(columns):
+            return name
+    return None
+
+
+def advise(bind=engine) -> List[dict]:
+    """Every expected lookup and foreign key, with the index serving it (None if missing)."""
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    checks = [pattern for pattern in QUERY_PATTERNS if pattern[0] in tables]
+    # Unindexed foreign keys make deletes of the referenced row scan this table
+    for table in sorted(tables):
+        for foreign_key in inspector.get_foreign_keys(table):
+            columns = tuple(foreign_key["constrained_columns"])
+            if not any(check[:2] == (table, columns) for check in checks):
+                checks.append((table, columns, f"foreign key to {foreign_key['referred_table']}"))
+
+    prefixes = {table: index_prefixes(inspector, table) for table in {check[0] for check in checks}}
+    return [
+        {
+            "table": table,
+            "columns": list(columns),
+            "used_by": used_by,
+            "index": covering_index(prefixes[table], columns),
+        }
+        for table, columns, used_by in checks
+    ]
+
+
+def create_index_statement(table: str, columns: Sequence[str]) -> str:
+    return f"CREATE INDEX ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report lookups in the live schema that no index serves")
+    parser.add_argument("--all", action="store_true", help="also list lookups that are already indexed")
+    args = parser.parse_args()
+
+    missing = 0
+    for finding in advise():
+        if finding["index"] is None:
+            missing += 1
+            print(f"MISSING  {finding['table']}({', '.join(finding['columns'])})  used by: {finding['used_by']}")
+            print(f"         {create_index_statement(finding['table'], finding['columns'])}")
+        elif args.all:
+            print(f"ok       {finding['table']}({', '.join(finding['columns'])})  via {finding['index']}")
+    print(f"{missing} missing index(es)")
+    sys.exit(1 if missing else 0)
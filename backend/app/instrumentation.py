@@ -0,0 +1,66 @@
+import time
+from contextvars import ContextVar
+from typing import Callable, List, MutableMapping, Optional
+from sqlalchemy import event
+
+
+class RequestStats:
+    """Per-request DB counters, shared with engine events through a contextvar."""
+
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope: MutableMapping):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI stores the matched route in the scope once routing has run;
+        # the template keeps label cardinality bounded (no ids in paths)
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+# Called as listener(conn, statement, parameters, seconds, executemany) after each statement
+StatementListener = Callable[..., None]
+statement_listeners: List[StatementListener] = []
+
+
+def start_request(scope: MutableMapping) -> RequestStats:
+    stats = RequestStats(scope)
+    current_request.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+    for listener in statement_listeners:
+        listener(conn, statement, parameters, seconds, executemany)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on a sync Engine or an AsyncEngine."""
+    engine = getattr(engine, "sync_engine", engine)
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,243 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy import select, update
+from . import models
+from .analytics import rebuild_option_counts
+from .user_summaries import rebuild_user_summaries
+from .catalog_sync import sync_catalog
+from .database import SessionLocal
+from .import_data import import_data
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "2"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+
+
+
+def _process_start(pid: int) -> Optional[str]:
+    # Start time in clock ticks since boot (Linux); with the pid it names one
+    # process, so a recycled pid isn't mistaken for the original worker
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{_process_start(os.getpid()) or '?'}"
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="jobs")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; everything here is written in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _update_job(job_id: str, **values) -> int:
+    with SessionLocal() as db:
+        result = db.execute(
+            update(models.ImportJob).where(models.ImportJob.id == job_id).values(**values)
+        )
+        db.commit()
+        return result.rowcount
+
+
+class ProgressReporter:
+    """Import progress callback; counts are flushed by the heartbeat thread.
+
+    Writing from the import thread would contend with the import's own
+    transaction (and deadlock on SQLite's single writer lock).
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, int] = {}
+
+    @property
+    def rows_processed(self) -> int:
+        return sum(self.tables.values())
+
+    def __call__(self, table: str, rows: int) -> None:
+        self.tables[table] = rows
+
+
+def _run_import(params: dict, reporter: ProgressReporter) -> dict:
+    counts = import_data(progress=reporter, **params)
+    return {"rows_processed": sum(counts.values()), "result": counts}
+
+
+def _run_sync(params: dict, reporter: ProgressReporter) -> dict:
+    report = sync_catalog(**params)
+    return {"rows_processed": report["changes"], "result": report}
+
+
+def _run_option_counts(params: dict, reporter: ProgressReporter) -> dict:
+    rows = rebuild_option_counts(**params)
+    return {"rows_processed": rows, "result": {"option_counts": rows}}
+
+
+def _run_user_summaries(params: dict, reporter: ProgressReporter) -> dict:
+    rows = rebuild_user_summaries()
+    return {"rows_processed": rows, "result": {"user_summaries": rows}}
+
+
+JOB_HANDLERS: Dict[str, Callable[[dict, ProgressReporter], dict]] = {
+    "import": _run_import,
+    "sync": _run_sync,
+    "option_counts": _run_option_counts,
+    "user_summaries": _run_user_summaries,
+}
+
+
+def _heartbeat(job_id: str, reporter: ProgressReporter, stop: threading.Event) -> None:
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            _update_job(job_id, rows_processed=reporter.rows_processed, heartbeat_at=utcnow())
+        except Exception:
+            logger.debug("Heartbeat for job %s failed", job_id, exc_info=True)
+
+
+def _claim(job_id: str) -> bool:
+    # Conditional update: exactly one worker process wins a queued job
+    now = utcnow()
+    with SessionLocal() as db:
+        result = db.execute(
+            update(models.ImportJob)
+            .where(models.ImportJob.id == job_id, models.ImportJob.status == "queued")
+            .values(status="running", worker=WORKER_ID, started_at=now, heartbeat_at=now)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+def _claim_and_run(job_id: str) -> None:
+    if not _claim(job_id):
+        return
+
+    with SessionLocal() as db:
+        job = db.get(models.ImportJob, job_id)
+        kind, params = job.kind, job.params or {}
+
+    reporter = ProgressReporter()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job_id, reporter, stop), daemon=True)
+    heartbeat.start()
+    try:
+        outcome = JOB_HANDLERS[kind](params, reporter)
+        _update_job(job_id, status="succeeded", finished_at=utcnow(), **outcome)
+        logger.info("Job %s (%s) succeeded", job_id, kind)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, kind)
+        _update_job(job_id, status="failed", finished_at=utcnow(), error=str(e))
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def enqueue_job(kind: str, params: Optional[dict] = None) -> str:
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(models.ImportJob(id=job_id, kind=kind, status="queued", params=params or {}, rows_processed=0))
+        db.commit()
+    _executor.submit(_claim_and_run, job_id)
+    return job_id
+
+
+def worker_alive(worker: Optional[str]) -> bool:
+    """Whether `worker` is a process on this host that is still running.
+
+    Workers on other hosts can't be checked and count as dead; their jobs are
+    judged by heartbeat alone.
+    """
+    host, _, process = (worker or "").partition(":")
+    pid, _, started = process.partition(":")
+    if host != socket.gethostname() or not pid.isdigit() or not started:
+        return False
+    if started == "?":
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    return _process_start(int(pid)) == started
+
+
+def recover_jobs() -> int:
+    """Requeue jobs orphaned by a dead worker and pick up anything still queued.
+
+    A stale heartbeat alone isn't proof: on SQLite the import holds the only
+    write lock, so a live job can't record heartbeats until it commits. Jobs
+    whose worker is still running on this host are left alone; for workers
+    on other hosts JOB_STALE_SECONDS must exceed the longest import.
+    """
+    cutoff = utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    with SessionLocal() as db:
+        stale = db.execute(
+            select(models.ImportJob.id, models.ImportJob.worker)
+            .where(
+                models.ImportJob.status == "running",
+                models.ImportJob.heartbeat_at < cutoff,
+            )
+        ).all()
+        orphaned = [job_id for job_id, worker in stale if not worker_alive(worker)]
+        if orphaned:
+            db.execute(
+                update(models.ImportJob)
+                .where(models.ImportJob.id.in_(orphaned), models.ImportJob.status == "running")
+                .values(status="queued", worker=None)
+            )
+            db.commit()
+        queued = db.execute(
+            select(models.ImportJob.id)
+            .where(models.ImportJob.status == "queued")
+            .order_by(models.ImportJob.created_at)
+        ).scalars().all()
+    for job_id in queued:
+        _executor.submit(_claim_and_run, job_id)
+    return len(queued)
+
+
+def job_status(job: models.ImportJob) -> dict:
+    started_at = as_utc(job.started_at)
+    finished_at = as_utc(job.finished_at)
+    elapsed = None
+    if started_at is not None:
+        elapsed = ((finished_at or utcnow()) - started_at).total_seconds()
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "rows_processed": job.rows_processed or 0,
+        "rows_per_second": (job.rows_processed or 0) / elapsed if elapsed else None,
+        "elapsed_seconds": elapsed,
+        "result": job.result,
+        "error": job.error,
+        "worker": job.worker,
+        "created_at": job.created_at,
+        "started_at": started_at,
+        "heartbeat_at": as_utc(job.heartbeat_at),
+        "finished_at": finished_at,
+    }
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,91 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Mapping, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+ACCESS_LOG_HEADERS = os.getenv("ACCESS_LOG_HEADERS", "false").lower() in ("1", "true", "yes")
+ACCESS_LOG_REDACT = {
+    name.strip().lower()
+    for name in os.getenv("ACCESS_LOG_REDACT", "authorization,cookie,set-cookie,password,token").split(",")
+    if name.strip()
+}
+
+access_logger = logging.getLogger("app.access")
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging() -> None:
+    """Route all records through a queue so handlers run on a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def redact(items: Mapping[str, str]) -> dict:
+    return {
+        key: "[REDACTED]" if key.lower() in ACCESS_LOG_REDACT else value
+        for key, value in items.items()
+    }
+
+
+def should_sample(status_code: int) -> bool:
+    # Server errors are always logged; everything else is sampled
+    return status_code >= 500 or random.random() < ACCESS_LOG_SAMPLE_RATE
+
+
+def log_access(request, status_code: int, duration_ms: float) -> None:
+    if not should_sample(status_code):
+        return
+    fields = {
+        "method": request.method,
+        "path": request.url.path,
+        "status": status_code,
+        "duration_ms": round(duration_ms, 2),
+        "client": request.client.host if request.client else None,
+    }
+    if request.query_params:
+        fields["query"] = redact(request.query_params)
+    if ACCESS_LOG_HEADERS:
+        fields["headers"] = redact(request.headers)
+    level = logging.ERROR if status_code >= 500 else logging.INFO
+    access_logger.log(level, "request", extra={"fields": fields})
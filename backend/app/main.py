@@ -1,22 +1,40 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import uuid
 from datetime import timedelta, datetime
 import logging
-from . import models, schemas, auth
-from .database import engine, SessionLocal
-from .import_data import import_data
+import time
+from . import models, schemas, auth, queries, submissions, export, pagination, jobs, analytics, http_cache, serialization
+from . import instrumentation, metrics, profiling, replica, slow_queries, user_summaries
+from .catalog_sync import sync_catalog
+from .compression import CompressionMiddleware
+from .cache import QUESTIONNAIRE_LIST_KEY, questionnaire_cache, user_cache
+from .database import async_engine, engine, pool_status, replica_async_engine
+from .hashing import HashingBusyError
+from .logging_config import configure_logging, log_access
 import sqlalchemy as sa
 from sqlalchemy import text
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Intake Questionnaire System")
+# Per-statement DB timings feed the per-request stats and /metrics
+instrumentation.instrument_engine(engine)
+instrumentation.instrument_engine(async_engine)
+if replica_async_engine is not None:
+    instrumentation.instrument_engine(replica_async_engine)
+instrumentation.statement_listeners.append(metrics.observe_statement)
+instrumentation.statement_listeners.append(profiling.record_statement)
+instrumentation.statement_listeners.append(slow_queries.record_statement)
+
+app = FastAPI(title="Intake Questionnaire System", default_response_class=ORJSONResponse)
 
 # CORS middleware
 origins = [
@@ -32,38 +50,79 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, "ETag", profiling.PROFILE_ID_HEADER],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+@app.on_event("startup")
+async def resume_jobs():
+    # Pick up jobs left queued or orphaned by a worker that died mid-run
+    try:
+        await run_in_threadpool(jobs.recover_jobs)
+    except Exception:
+        logger.exception("Could not recover background jobs")
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    jobs.shutdown()
+
+@app.exception_handler(pagination.InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: pagination.InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    # Shed load instead of queueing more bcrypt work behind a saturated pool
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    logger.info(f"Request path: {request.url.path}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request headers: {request.headers}")
-    
-    response = await call_next(request)
-    
-    logger.info(f"Response status: {response.status_code}")
-    logger.info(f"Response headers: {dict(response.headers)}")
-    return response
+    start = time.perf_counter()
+    status_code = 500
+    stats = instrumentation.start_request(request.scope)
+    metrics.REQUESTS_IN_PROGRESS.labels(request.method).inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        duration = time.perf_counter() - start
+        metrics.REQUESTS_IN_PROGRESS.labels(request.method).dec()
+        metrics.observe_request(request.method, stats, status_code, duration)
+        log_access(request, status_code, duration * 1000)
+
+# Registered last, so it is the outermost middleware and a profile covers the
+# whole stack, log_requests included
+app.add_middleware(profiling.ProfilingMiddleware)
 
 @app.get("/")
 async def root():
     return {"message": "API is running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/db-test")
-async def test_db(db: Session = Depends(auth.get_db)):
+async def test_db(db: AsyncSession = Depends(auth.get_db)):
     try:
         # Try to query users table
-        users = db.query(models.User).all()
+        users = (await db.execute(select(models.User))).scalars().all()
         
         # Check alembic_version table
-        inspector = sa.inspect(engine)
-        tables = inspector.get_table_names()
+        connection = await db.connection()
+        tables = await connection.run_sync(lambda conn: sa.inspect(conn).get_table_names())
         
         # Check if alembic_version exists and get current version
         current_version = None
         if 'alembic_version' in tables:
-            result = db.execute(sa.text('SELECT version_num FROM alembic_version')).first()
+            result = (await db.execute(sa.text('SELECT version_num FROM alembic_version'))).first()
             current_version = result[0] if result else None
         
         return {
@@ -78,10 +137,10 @@ async def test_db(db: Session = Depends(auth.get_db)):
         return {"status": "error", "message": str(e)}
 
 @app.get("/test-db")
-async def test_db(db: Session = Depends(auth.get_db)):
+async def test_db(db: AsyncSession = Depends(auth.get_db)):
     try:
         # Try to execute a simple query
-        result = db.execute(text("SELECT 1"))
+        result = await db.execute(text("SELECT 1"))
         return {"status": "ok", "message": "Database connection successful"}
     except Exception as e:
         logger.error(f"Database connection error: {str(e)}")
@@ -95,13 +154,12 @@ async def token_preflight():
 @app.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(auth.get_db)
+    db: AsyncSession = Depends(auth.get_db)
 ):
-    logger.info("Login attempt for user: %s", form_data.username)
     try:
-        user = auth.authenticate_user(db, form_data.username, form_data.password)
+        user = await auth.authenticate_user(db, form_data.username, form_data.password)
         if not user:
-            logger.error("Invalid credentials for user: %s", form_data.username)
+            logger.warning("Invalid credentials for user: %s", form_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
@@ -110,10 +168,12 @@ async def login_for_access_token(
         
         access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = auth.create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
+            data=auth.token_claims(user), expires_delta=access_token_expires
         )
-        logger.info("Login successful for user: %s", form_data.username)
+        auth.cache_user(user)
         return {"access_token": access_token, "token_type": "bearer"}
+    except (HTTPException, HashingBusyError):
+        raise
     except Exception as e:
         logger.error("Login error for user %s: %s", form_data.username, str(e))
         raise
@@ -122,20 +182,20 @@ async def login_for_access_token(
 @app.post("/users/", response_model=schemas.User)
 async def create_user(
     user: schemas.UserCreate,
-    db: Session = Depends(auth.get_db)
+    db: AsyncSession = Depends(auth.get_db)
 ):
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
+    db_user = await auth.get_user_by_username(db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await auth.get_password_hash_async(user.password)
     db_user = models.User(
         id=str(uuid.uuid4()),
         username=user.username,
         password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @app.options("/users/me")
@@ -145,226 +205,438 @@ async def users_me_preflight():
 
 @app.get("/users/me")
 @app.get("/users/me/", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(auth.get_current_active_user)):
-    return {
-        "id": current_user.id,
-        "username": current_user.username,
-        "is_admin": current_user.is_admin
-    }
+async def read_users_me(
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    body = http_cache.cached_body(
+        schemas.User.model_validate(current_user, from_attributes=True).model_dump_json().encode()
+    )
+    return await http_cache.conditional_response(request, body, http_cache.USER_CACHE_CONTROL)
 
 # Questionnaire endpoints
 @app.get("/questionnaires/", response_model=List[schemas.Questionnaire])
 async def list_questionnaires(
-    db: Session = Depends(auth.get_db),
+    request: Request,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    return db.query(models.Questionnaire).all()
+    await queries.refresh_catalog_cache(db)
+    body = questionnaire_cache.get(QUESTIONNAIRE_LIST_KEY)
+    if body is None:
+        result = await db.execute(select(models.Questionnaire))
+        body = http_cache.cached_body(
+            serialization.dump_json(List[schemas.Questionnaire], result.scalars().all())
+        )
+        questionnaire_cache.set(QUESTIONNAIRE_LIST_KEY, body)
+    
+    return await http_cache.conditional_response(request, body, http_cache.CATALOG_CACHE_CONTROL)
 
 @app.get("/questionnaires/{questionnaire_id}", response_model=schemas.QuestionnaireWithQuestions)
 async def get_questionnaire(
     questionnaire_id: int,
-    db: Session = Depends(auth.get_db),
+    request: Request,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    questionnaire = db.query(models.Questionnaire).filter(models.Questionnaire.id == questionnaire_id).first()
-    if not questionnaire:
-        raise HTTPException(status_code=404, detail="Questionnaire not found")
-    
-    # Get questions ordered by priority
-    questions = []
-    junctions = (
-        db.query(models.QuestionJunction)
-        .filter(models.QuestionJunction.questionnaire_id == questionnaire_id)
-        .order_by(models.QuestionJunction.priority)
-        .all()
-    )
-    
-    for junction in junctions:
-        questions.append(junction.question)
+    await queries.refresh_catalog_cache(db)
+    body = questionnaire_cache.get(questionnaire_id)
+    if body is None:
+        questionnaire, questions = await queries.get_questionnaire_with_questions(db, questionnaire_id)
+        if not questionnaire:
+            raise HTTPException(status_code=404, detail="Questionnaire not found")
+        
+        # Validate once and keep the serialized bytes and their ETag for subsequent requests
+        body = http_cache.cached_body(serialization.dump_json(
+            schemas.QuestionnaireWithQuestions,
+            {
+                "id": questionnaire.id,
+                "name": questionnaire.name,
+                "created_at": questionnaire.created_at,
+                "updated_at": questionnaire.updated_at,
+                "questions": questions,
+            },
+        ))
+        questionnaire_cache.set(questionnaire_id, body)
     
-    return {
-        **questionnaire.__dict__,
-        "questions": questions
-    }
+    return await http_cache.conditional_response(request, body, http_cache.CATALOG_CACHE_CONTROL)
 
 # Response endpoints
 @app.post("/responses/", response_model=schemas.Response)
 async def create_response(
     response: schemas.ResponseCreate,
-    db: Session = Depends(auth.get_db),
+    db: AsyncSession = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    logger.info(f"Creating response for user {current_user.id} questionnaire {response.questionnaire_id}")
-    logger.info(f"Answers: {response.answers}")
-    
     try:
-        # Validate that all questions exist
-        for answer in response.answers:
-            question = db.query(models.Question).filter(models.Question.id == answer.question_id).first()
-            if not question:
-                raise HTTPException(status_code=400, detail=f"Question {answer.question_id} not found")
-            logger.info(f"Question {answer.question_id} exists, type: {question.type}, value: {answer.value}")
-
-        # Check if user has already submitted a response for this questionnaire
-        existing_response = db.query(models.Response).filter(
-            models.Response.user_id == current_user.id,
-            models.Response.questionnaire_id == response.questionnaire_id
-        ).first()
-
-        if existing_response:
-            logger.info(f"Found existing response {existing_response.id}, deleting it")
-            # Delete existing response and its answers
-            db.query(models.Answer).filter(models.Answer.response_id == existing_response.id).delete()
-            db.delete(existing_response)
-            db.commit()
-
-        # Create new response
-        db_response = models.Response(
-            id=str(uuid.uuid4()),
-            user_id=current_user.id,
-            questionnaire_id=response.questionnaire_id
+        db_response = await submissions.submit_response(
+            db, current_user.id, response.questionnaire_id, response.answers
         )
-        db.add(db_response)
-        db.commit()  # Commit to get the response ID
-        
-        logger.info(f"Created new response {db_response.id}")
-        
-        # Create answers
-        for answer_data in response.answers:
-            logger.info(f"Creating answer for question {answer_data.question_id}")
-            logger.info(f"Answer value type: {type(answer_data.value)}")
-            logger.info(f"Answer value: {answer_data.value}")
-            
-            answer = models.Answer(
-                id=str(uuid.uuid4()),
-                response_id=db_response.id,
-                question_id=answer_data.question_id,
-                value=answer_data.value
-            )
-            db.add(answer)
-        
-        db.commit()
-        db.refresh(db_response)
-        return db_response
+        return serialization.json_response(schemas.Response, db_response)
         
+    except submissions.InvalidAnswersError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error creating response: {str(e)}")
-        logger.exception("Full traceback:")
-        db.rollback()
+        logger.exception("Error creating response")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Admin endpoints
 @app.get("/admin/responses/", response_model=List[schemas.Response])
 async def list_all_responses(
-    db: Session = Depends(auth.get_db),
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
-    return db.query(models.Response).all()
+    responses, next_cursor = await queries.list_responses(
+        db, limit, cursor,
+        questionnaire_id=questionnaire_id,
+        user_id=user_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    http_response = serialization.json_response(List[schemas.Response], responses)
+    pagination.set_next_cursor(http_response, next_cursor)
+    return http_response
+
+@app.get("/admin/responses/search", response_model=List[schemas.Response])
+async def search_responses(
+    option: str,
+    question_id: Optional[int] = None,
+    questionnaire_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Responses where the given MCQ option was selected
+    responses, next_cursor = await queries.list_responses(
+        db, limit, cursor,
+        questionnaire_id=questionnaire_id,
+        created_from=created_from,
+        created_to=created_to,
+        selected_option=option,
+        selected_question_id=question_id,
+    )
+    http_response = serialization.json_response(List[schemas.Response], responses)
+    pagination.set_next_cursor(http_response, next_cursor)
+    return http_response
+
+@app.get("/admin/responses/export")
+async def export_responses(
+    format: str = "csv",
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if format not in export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    return StreamingResponse(
+        export.iter_export(format),
+        media_type=export.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="responses.{format}"'},
+    )
 
 @app.get("/admin/users/{user_id}/responses", response_model=List[schemas.Response])
 async def get_user_responses(
     user_id: str,
-    db: Session = Depends(auth.get_db),
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
-    return db.query(models.Response).filter(models.Response.user_id == user_id).all()
+    responses, next_cursor = await queries.list_responses(
+        db, limit, cursor,
+        questionnaire_id=questionnaire_id,
+        user_id=user_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    http_response = serialization.json_response(List[schemas.Response], responses)
+    pagination.set_next_cursor(http_response, next_cursor)
+    return http_response
 
 @app.get("/admin/user-responses")
 async def get_user_responses(
-    db: Session = Depends(auth.get_db),
+    http_response: Response,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "username",
+    questionnaire_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
+    """Non-admin users with response count, questionnaires completed and last submission.
+
+    `sort` is one of username, response_count, questionnaires_completed or
+    last_submission_at (users who never submitted last). With questionnaire_id,
+    created_from or created_to the fields cover only the matching responses,
+    and only sort=username is supported (400 otherwise).
+    """
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
+    if sort not in user_summaries.SUMMARY_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort: {sort}")
     
-    # Get all non-admin users and their response counts
-    user_responses = db.query(
-        models.User.username,
-        sa.func.count(models.Response.id).label('response_count')
-    ).outerjoin(
-        models.Response
-    ).filter(
-        models.User.is_admin == False  # Only get non-admin users
-    ).group_by(
-        models.User.username
-    ).all()
+    if questionnaire_id is None and created_from is None and created_to is None:
+        # Unfiltered: served from the maintained per-user summaries
+        rows, next_cursor = await user_summaries.list_user_summaries(db, limit, cursor, sort)
+    else:
+        # Filtered counts can't come from the summaries; counted live, by username only
+        if sort != "username":
+            raise HTTPException(status_code=400, detail="Filtered results can only be sorted by username")
+        rows, next_cursor = await queries.list_user_response_counts(
+            db, limit, cursor,
+            questionnaire_id=questionnaire_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    pagination.set_next_cursor(http_response, next_cursor)
     
-    return [{"username": username, "response_count": count} for username, count in user_responses]
+    return [
+        {
+            "username": row.username,
+            "response_count": row.response_count,
+            "questionnaires_completed": row.questionnaires_completed,
+            "last_submission_at": row.last_submission_at,
+        }
+        for row in rows
+    ]
+
+@app.post("/admin/user-responses/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_user_summaries(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job_id = await run_in_threadpool(jobs.enqueue_job, "user_summaries")
+    return {"job_id": job_id, "status": "queued"}
 
 @app.get("/admin/user-responses/{username}")
 async def get_user_response_details(
     username: str,
-    db: Session = Depends(auth.get_db),
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get user's responses with questionnaire details
-    user = db.query(models.User).filter(models.User.username == username).first()
+    # Get user's responses with questionnaire, answer and question details
+    user = await queries.get_user_with_responses(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    responses = db.query(
-        models.Response,
-        models.Questionnaire.name.label('questionnaire_name')
-    ).join(
-        models.Questionnaire
-    ).filter(
-        models.Response.user_id == user.id
-    ).all()
-    
     result = []
-    for response, questionnaire_name in responses:
-        # Get answers with questions
-        answers = db.query(
-            models.Answer,
-            models.Question
-        ).join(
-            models.Question
-        ).filter(
-            models.Answer.response_id == response.id
-        ).order_by(
-            models.Question.id
-        ).all()
+    for response in user.responses:
+        answers = sorted(response.answers, key=lambda answer: answer.question.id)
         
         formatted_answers = []
-        for answer, question in answers:
+        for answer in answers:
             formatted_answers.append({
-                "question": question.question,
+                "question": answer.question.question,
                 "answer": answer.value
             })
         
         result.append({
             "username": username,
-            "questionnaire_name": questionnaire_name,
+            "questionnaire_name": response.questionnaire.name,
             "answers": formatted_answers
         })
     
     return result
 
-# Data import endpoint (admin only)
-@app.post("/admin/import-data")
+@app.get("/admin/analytics/questionnaires/{questionnaire_id}/option-counts")
+async def get_option_counts(
+    questionnaire_id: int,
+    question_id: Optional[int] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Served from the precomputed answer_option_counts table
+    return {
+        "questionnaire_id": questionnaire_id,
+        "questions": await analytics.get_option_counts(db, questionnaire_id, question_id),
+    }
+
+@app.post("/admin/analytics/option-counts/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_option_counts(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job_id = await run_in_threadpool(jobs.enqueue_job, "option_counts")
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/admin/cache-stats")
+async def get_cache_stats(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return {"questionnaires": questionnaire_cache.stats(), "users": user_cache.stats()}
+
+@app.get("/admin/hashing-stats")
+async def get_hashing_stats(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return auth.password_hasher.stats()
+
+@app.get("/admin/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = "total_ms",
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if sort not in ("total_ms", "max_ms", "count"):
+        raise HTTPException(status_code=400, detail=f"Unsupported sort: {sort}")
+    
+    # Slowest statement fingerprints seen by this worker since startup (or the last reset)
+    return {
+        "threshold_ms": slow_queries.SLOW_QUERY_THRESHOLD_MS,
+        "statements": slow_queries.slow_query_log.top(limit, sort),
+    }
+
+@app.delete("/admin/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    slow_queries.slow_query_log.clear()
+
+@app.get("/admin/profiles")
+async def list_profiles(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return await run_in_threadpool(profiling.list_profiles)
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = "speedscope",
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if format not in profiling.PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    try:
+        content = await run_in_threadpool(profiling.render_profile, profile_id, format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    extension = {"collapsed": "txt", "speedscope": "speedscope.json", "sql": "sql.json"}[format]
+    return Response(
+        content=content,
+        media_type=profiling.PROFILE_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.{extension}"'},
+    )
+
+@app.get("/admin/db-pool")
+async def get_db_pool_status(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return {**pool_status(), "replica_routing": replica.replica_state.snapshot()}
+
+# Data import endpoints (admin only)
+@app.post("/admin/import-data", status_code=status.HTTP_202_ACCEPTED)
 async def import_csv_data(
+    mode: str = "replace",
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if mode not in ("replace", "sync"):
+        raise HTTPException(status_code=400, detail=f"Unsupported mode: {mode}")
+    
+    # Run in a background job; poll GET /admin/jobs/{job_id} for progress
+    job_id = await run_in_threadpool(jobs.enqueue_job, "import" if mode == "replace" else "sync")
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/admin/jobs")
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(auth.get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    result = await db.execute(
+        select(models.ImportJob).order_by(models.ImportJob.created_at.desc()).limit(limit)
+    )
+    return [jobs.job_status(job) for job in result.scalars().all()]
+
+@app.get("/admin/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(auth.get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job = await db.get(models.ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_status(job)
+
+@app.post("/admin/sync-catalog")
+async def sync_catalog_data(
+    http_response: Response,
+    dry_run: bool = False,
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
+    """Preview (dry_run, answered inline) or apply a catalog sync.
+
+    Applying rewrites the catalog, so like /admin/import-data it runs as a
+    background job (202 with a job id to poll).
+    """
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
+    if not dry_run:
+        job_id = await run_in_threadpool(jobs.enqueue_job, "sync")
+        http_response.status_code = status.HTTP_202_ACCEPTED
+        return {"job_id": job_id, "status": "queued"}
     try:
-        import_data()
-        return {"message": "Data imported successfully"}
+        return await run_in_threadpool(sync_catalog, True)
     except Exception as e:
+        logger.exception("Catalog sync failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/create-test-users")
-async def create_test_users(db: Session = Depends(auth.get_db)):
+async def create_test_users(db: AsyncSession = Depends(auth.get_db)):
     try:
         # Check if users already exist
-        if db.query(models.User).count() > 0:
+        if (await db.execute(select(sa.func.count(models.User.id)))).scalar_one() > 0:
             return {"status": "error", "message": "Users already exist"}
         
         # Create test users
@@ -372,21 +644,20 @@ async def create_test_users(db: Session = Depends(auth.get_db)):
             models.User(
                 id=str(uuid.uuid4()),
                 username="admin",
-                password=auth.get_password_hash("admin123"),
+                password=await auth.get_password_hash_async("admin123"),
                 is_admin=True
             ),
             models.User(
                 id=str(uuid.uuid4()),
                 username="user",
-                password=auth.get_password_hash("user123"),
+                password=await auth.get_password_hash_async("user123"),
                 is_admin=False
             )
         ]
         
         # Add users to database
-        for user in users:
-            db.add(user)
-        db.commit()
+        db.add_all(users)
+        await db.commit()
         
         return {
             "status": "success",
@@ -394,6 +665,6 @@ async def create_test_users(db: Session = Depends(auth.get_db)):
             "users": [{"username": user.username, "is_admin": user.is_admin} for user in users]
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating test users: {str(e)}")
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,80 @@
+import os
+from typing import Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from .instrumentation import RequestStats
+
+# Set by gunicorn.conf.py before the workers fork. Each worker then writes its
+# samples to files in this directory and /metrics aggregates all of them.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+STATEMENT_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "SQL statement latency", ["operation"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time on the worker thread", ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_wait_seconds", "Time bcrypt operations waited for a worker thread", ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement and statement.strip() else ""
+    return keyword if keyword in STATEMENT_OPERATIONS else "OTHER"
+
+
+def observe_request(method: str, stats: RequestStats, status_code: int, seconds: float) -> None:
+    route = stats.route
+    REQUESTS.labels(method, route, str(status_code)).inc()
+    REQUEST_DURATION.labels(method, route).observe(seconds)
+    REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+    REQUEST_DB_DURATION.labels(method, route).observe(stats.db_seconds)
+
+
+def observe_statement(conn, statement: str, parameters, seconds: float, executemany: bool) -> None:
+    DB_STATEMENT_DURATION.labels(statement_operation(statement)).observe(seconds)
+
+
+def observe_password_hash(operation: str, hash_seconds: float, wait_seconds: float) -> None:
+    PASSWORD_HASH_DURATION.labels(operation).observe(hash_seconds)
+    PASSWORD_HASH_WAIT.labels(operation).observe(wait_seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
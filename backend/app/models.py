@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, UniqueConstraint, Index
+from sqlalchemy import event, insert
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -18,10 +19,11 @@ class Questionnaire(Base):
 
     id = Column(Integer, primary_key=True)
     name = Column(String)
+    row_hash = Column(String)  # content hash of the source CSV row, for catalog sync
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    junctions = relationship("QuestionJunction", back_populates="questionnaire")
+    junctions = relationship("QuestionJunction", back_populates="questionnaire", order_by="QuestionJunction.priority")
     responses = relationship("Response", back_populates="questionnaire")
 
 class Question(Base):
@@ -31,6 +33,7 @@ class Question(Base):
     type = Column(String)  # mcq or input
     options = Column(JSON)  # JSON array for mcq type questions
     question = Column(String)
+    row_hash = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -44,13 +47,19 @@ class QuestionJunction(Base):
     questionnaire_id = Column(Integer, ForeignKey("questionnaires.id"))
     question_id = Column(Integer, ForeignKey("questions.id"))
     priority = Column(Integer)
+    row_hash = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     questionnaire = relationship("Questionnaire", back_populates="junctions")
     question = relationship("Question", back_populates="junctions")
 
-    __table_args__ = (UniqueConstraint('questionnaire_id', 'question_id'),)
+    __table_args__ = (
+        UniqueConstraint('questionnaire_id', 'question_id'),
+        # Questions of a questionnaire in display order
+        Index('ix_question_junctions_questionnaire_id_priority', 'questionnaire_id', 'priority'),
+        Index('ix_question_junctions_question_id', 'question_id'),
+    )
 
 class Response(Base):
     __tablename__ = "responses"
@@ -65,7 +74,13 @@ class Response(Base):
     questionnaire = relationship("Questionnaire", back_populates="responses")
     answers = relationship("Answer", back_populates="response")
 
-    __table_args__ = (UniqueConstraint('user_id', 'questionnaire_id'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'questionnaire_id'),
+        # Keyset pagination on (created_at, id), optionally scoped by questionnaire or user
+        Index('ix_responses_created_at_id', 'created_at', 'id'),
+        Index('ix_responses_questionnaire_id_created_at_id', 'questionnaire_id', 'created_at', 'id'),
+        Index('ix_responses_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
 
 class Answer(Base):
     __tablename__ = "answers"
@@ -79,5 +94,83 @@ class Answer(Base):
 
     response = relationship("Response", back_populates="answers")
     question = relationship("Question", back_populates="answers")
+    selections = relationship("AnswerSelection", back_populates="answer")
 
-    __table_args__ = (UniqueConstraint('response_id', 'question_id'),)
+    __table_args__ = (
+        UniqueConstraint('response_id', 'question_id'),
+        Index('ix_answers_question_id', 'question_id'),
+    )
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    # Single row, bumped in the same transaction as every catalog rewrite, so
+    # each worker can tell that its cached questionnaire payloads are stale
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class AnswerSelection(Base):
+    __tablename__ = "answer_selections"
+
+    # One row per option picked in an MCQ answer, so option lookups can use an index
+    answer_id = Column(String, ForeignKey("answers.id"), primary_key=True)
+    option = Column(String, primary_key=True)
+    response_id = Column(String, ForeignKey("responses.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+
+    answer = relationship("Answer", back_populates="selections")
+
+    __table_args__ = (
+        Index('ix_answer_selections_option_question_id', 'option', 'question_id', 'response_id'),
+        Index('ix_answer_selections_response_id', 'response_id'),
+        Index('ix_answer_selections_question_id', 'question_id'),
+    )
+
+class AnswerOptionCount(Base):
+    __tablename__ = "answer_option_counts"
+
+    # Derived from answers (see analytics.py), so no foreign keys: catalog
+    # changes never have to wait on the aggregate
+    questionnaire_id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    option = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class UserResponseSummary(Base):
+    __tablename__ = "user_response_summaries"
+
+    # Derived from responses (see user_summaries.py), one row per user, so the
+    # admin user listing never aggregates the responses table
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    response_count = Column(Integer, nullable=False, default=0)
+    questionnaires_completed = Column(Integer, nullable=False, default=0)  # responses answering every question
+    last_submission_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index('ix_user_response_summaries_response_count_user_id', 'response_count', 'user_id'),
+        Index('ix_user_response_summaries_questionnaires_completed_user_id', 'questionnaires_completed', 'user_id'),
+        Index('ix_user_response_summaries_last_submission_at_user_id', 'last_submission_at', 'user_id'),
+    )
+
+# Users who never submit are listed too, so every user starts with a summary
+# row. Registered with the models so every ORM insert of a User gets it; Core
+# inserts (import_data, benchmarks/seed.py) add or rebuild the rows themselves.
+@event.listens_for(User, "after_insert")
+def _create_response_summary(mapper, connection, target):
+    connection.execute(insert(UserResponseSummary.__table__).values(user_id=target.id))
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String)  # import, sync, option_counts or user_summaries
+    status = Column(String, index=True)  # queued, running, succeeded or failed
+    params = Column(JSON)
+    rows_processed = Column(Integer, default=0)
+    result = Column(JSON)
+    error = Column(String)
+    worker = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import literal, String, tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    encoded = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(encoded).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("wrong cursor size")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in values
+        ]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def bind_datetime(dialect_name: str, value: datetime):
+    # SQLite keeps CURRENT_TIMESTAMP defaults as "YYYY-MM-DD HH:MM:SS" text, while
+    # SQLAlchemy binds datetimes with microseconds; compare in the stored format
+    # so equal timestamps compare equal.
+    if dialect_name == "sqlite":
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return literal(value.strftime(fmt), String)
+    return value
+
+
+def keyset_filter(dialect_name: str, columns: Sequence, values: Sequence[Any], descending: bool = True):
+    bound = [
+        bind_datetime(dialect_name, value) if isinstance(value, datetime) else literal(value)
+        for value in values
+    ]
+    if descending:
+        return tuple_(*columns) < tuple_(*bound)
+    return tuple_(*columns) > tuple_(*bound)
+
+
+def paginate(rows: Sequence, limit: int, cursor_of) -> tuple:
+    """Split `limit + 1` fetched rows into the page and the next cursor (or None)."""
+    if len(rows) > limit:
+        page = rows[:limit]
+        return page, encode_cursor(cursor_of(page[-1]))
+    return rows, None
+
+
+def set_next_cursor(response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .auth import decode_token, resolve_principal
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/intake-profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_FORMATS = {
+    "collapsed": "text/plain",
+    "speedscope": "application/json",
+    "sql": "application/json",
+}
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a helper thread.
+
+    The event loop thread is shared by concurrent requests, so under load a
+    profile also contains frames from whatever else the loop was running.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, short_path(code.co_filename), frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class Profile:
+    def __init__(self, scope: Scope):
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.sampler = StackSampler(threading.get_ident())
+        self.statements: List[dict] = []
+        self.status: Optional[int] = None
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+
+
+current_profile: ContextVar[Optional[Profile]] = ContextVar("current_profile", default=None)
+
+
+def short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.relpath(filename) if filename.startswith(os.getcwd()) else filename
+
+
+def record_statement(conn, statement: str, parameters, seconds: float, executemany: bool) -> None:
+    # Statement listener (see instrumentation.statement_listeners); a no-op unless profiling
+    profile = current_profile.get()
+    if profile is not None:
+        profile.statements.append({
+            "statement": statement,
+            "duration_ms": round(seconds * 1000, 3),
+            "executemany": executemany,
+        })
+
+
+async def is_admin_token(authorization: Optional[str]) -> bool:
+    # Resolved like get_current_user (admins are always read from the database),
+    # so a demoted admin's unexpired token can't switch the profiler on
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    token_data = decode_token(authorization[7:])
+    if token_data is None:
+        return False
+    async with AsyncSessionLocal() as db:
+        principal = await resolve_principal(db, token_data)
+    return principal is not None and principal.is_admin
+
+
+async def should_profile(scope: Scope) -> bool:
+    headers = Headers(scope=scope)
+    if PROFILE_HEADER.lower() in headers:
+        return await is_admin_token(headers.get("authorization"))
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def collapsed(stacks: List[Tuple[list, int]]) -> str:
+    """Brendan Gregg's collapsed format, as consumed by flamegraph.pl and speedscope."""
+    lines = []
+    for frames, count in stacks:
+        names = [f"{name} ({path}:{line})" for name, path, line in frames]
+        lines.append(f"{';'.join(names)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def speedscope(profile: dict) -> dict:
+    frames, frame_index, samples, weights = [], {}, [], []
+    for stack, count in profile["stacks"]:
+        indexes = []
+        for name, path, line in stack:
+            key = (name, path, line)
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append({"name": name, "file": path, "line": line})
+            indexes.append(frame_index[key])
+        samples.append(indexes)
+        weights.append(count * profile["interval_ms"])
+    name = f"{profile['method']} {profile['path']}"
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "intake-questionnaire-system",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+def profile_path(profile_id: str) -> str:
+    # Ids are generated here; refuse anything that could escape PROFILE_DIR
+    if not profile_id.replace("-", "").isalnum():
+        raise FileNotFoundError(profile_id)
+    return os.path.join(PROFILE_DIR, f"{profile_id}.json")
+
+
+def save_profile(profile: Profile) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    document = {
+        "id": profile.id,
+        "method": profile.method,
+        "path": profile.path,
+        "status": profile.status,
+        "duration_ms": round(profile.duration_ms, 3),
+        "interval_ms": profile.sampler.interval * 1000,
+        "samples": sum(profile.sampler.stacks.values()),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "statements": profile.statements,
+        "stacks": [[list(stack), count] for stack, count in profile.sampler.stacks.most_common()],
+    }
+    with open(profile_path(profile.id), "w") as profile_file:
+        json.dump(document, profile_file)
+
+    # Keep only the newest PROFILE_MAX_FILES profiles
+    files = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for name in files[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+
+def load_profile(profile_id: str) -> dict:
+    with open(profile_path(profile_id)) as profile_file:
+        return json.load(profile_file)
+
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    summaries = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            profile = load_profile(name[:-len(".json")])
+        except (OSError, ValueError):
+            continue
+        summaries.append({
+            key: profile[key] for key in ("id", "method", "path", "status", "duration_ms", "samples", "created_at")
+        } | {"statements": len(profile["statements"])})
+    return summaries
+
+
+def render_profile(profile_id: str, format: str) -> str:
+    profile = load_profile(profile_id)
+    if format == "collapsed":
+        return collapsed(profile["stacks"])
+    if format == "speedscope":
+        return json.dumps(speedscope(profile))
+    return json.dumps(profile["statements"])
+
+
+class ProfilingMiddleware:
+    """Profile sampled requests, or those sending PROFILE_HEADER with an admin token.
+
+    Anything else is passed straight through, so the cost with profiling off
+    is one header lookup per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not await should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope)
+        token = current_profile.set(profile)
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile.id
+            await send(message)
+
+        profile.sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.sampler.stop()
+            profile.duration_ms = (time.perf_counter() - profile.started) * 1000
+            current_profile.reset(token)
+            try:
+                await to_thread.run_sync(save_profile, profile)
+            except OSError:
+                logger.exception("Could not save profile %s", profile.id)
@@ -0,0 +1,206 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, case, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from . import models
+from .cache import catalog_version_check, questionnaire_cache
+from .pagination import bind_datetime, decode_cursor, keyset_filter, paginate
+
+
+async def refresh_catalog_cache(db: AsyncSession) -> None:
+    """Drop this worker's cached catalog payloads if another process rewrote the catalog."""
+    if not catalog_version_check.due():
+        return
+    version = (await db.execute(select(models.CatalogVersion.version).where(models.CatalogVersion.id == 1))).scalar()
+    if catalog_version_check.changed(version):
+        questionnaire_cache.clear()
+
+
+async def get_questionnaire_with_questions(
+    db: AsyncSession, questionnaire_id: int
+) -> Tuple[Optional[models.Questionnaire], List[models.Question]]:
+    # One query for the questionnaire, one for junctions (in priority order) joined to their questions
+    result = await db.execute(
+        select(models.Questionnaire)
+        .options(selectinload(models.Questionnaire.junctions).joinedload(models.QuestionJunction.question))
+        .where(models.Questionnaire.id == questionnaire_id)
+    )
+    questionnaire = result.scalars().first()
+    if not questionnaire:
+        return None, []
+    return questionnaire, [junction.question for junction in questionnaire.junctions]
+
+
+async def get_user_with_responses(db: AsyncSession, username: str) -> Optional[models.User]:
+    # User, responses (with questionnaire) and answers (with question) in three queries
+    result = await db.execute(
+        select(models.User)
+        .options(
+            selectinload(models.User.responses).options(
+                joinedload(models.Response.questionnaire),
+                selectinload(models.Response.answers).joinedload(models.Answer.question),
+            )
+        )
+        .where(models.User.username == username)
+    )
+    return result.scalars().first()
+
+
+def _created_between(dialect_name: str, created_from: Optional[datetime], created_to: Optional[datetime]):
+    conditions = []
+    if created_from is not None:
+        conditions.append(models.Response.created_at >= bind_datetime(dialect_name, created_from))
+    if created_to is not None:
+        conditions.append(models.Response.created_at < bind_datetime(dialect_name, created_to))
+    return conditions
+
+
+async def list_responses(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    user_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    selected_option: Optional[str] = None,
+    selected_question_id: Optional[int] = None,
+) -> Tuple[List[models.Response], Optional[str]]:
+    """Newest-first page of responses, keyed on (created_at, id).
+
+    `selected_option` keeps only responses where that MCQ option was picked
+    (optionally for `selected_question_id`), via the answer_selections index.
+    """
+    dialect_name = db.bind.dialect.name
+    stmt = select(models.Response).options(selectinload(models.Response.answers))
+    if selected_option is not None:
+        selections = models.AnswerSelection
+        matching = select(selections.response_id).where(selections.option == selected_option)
+        if selected_question_id is not None:
+            matching = matching.where(selections.question_id == selected_question_id)
+        stmt = stmt.where(models.Response.id.in_(matching))
+    if questionnaire_id is not None:
+        stmt = stmt.where(models.Response.questionnaire_id == questionnaire_id)
+    if user_id is not None:
+        stmt = stmt.where(models.Response.user_id == user_id)
+    for condition in _created_between(dialect_name, created_from, created_to):
+        stmt = stmt.where(condition)
+    if cursor:
+        stmt = stmt.where(keyset_filter(
+            dialect_name,
+            (models.Response.created_at, models.Response.id),
+            decode_cursor(cursor, 2),
+        ))
+    stmt = stmt.order_by(models.Response.created_at.desc(), models.Response.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    return paginate(rows, limit, lambda response: (response.created_at, response.id))
+
+
+def response_completion(*conditions):
+    """(answered, questions, completed) for counting responses that answer every question.
+
+    `answered` and `questions` are subqueries to outer-join on response id and
+    questionnaire id; `completed` is 1 for a complete response, else 0.
+    `conditions` on Response restrict `answered` to the answers of matching
+    responses, so a filtered count doesn't aggregate the whole answers table.
+    """
+    answered = select(models.Answer.response_id, func.count().label("answered"))
+    if conditions:
+        answered = answered.join(models.Response, models.Response.id == models.Answer.response_id).where(*conditions)
+    answered = answered.group_by(models.Answer.response_id).subquery()
+    questions = (
+        select(models.QuestionJunction.questionnaire_id, func.count().label("questions"))
+        .group_by(models.QuestionJunction.questionnaire_id)
+        .subquery()
+    )
+    return answered, questions, case((answered.c.answered >= questions.c.questions, 1), else_=0)
+
+
+def user_response_counts_statement(
+    dialect_name: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    # The page of users is picked first, so the aggregation only touches the
+    # matching responses (and their answers) of limit + 1 users
+    users = select(models.User.id, models.User.username).where(models.User.is_admin == False)  # Only get non-admin users
+    if cursor:
+        users = users.where(keyset_filter(
+            dialect_name, (models.User.username,), decode_cursor(cursor, 1), descending=False
+        ))
+    page = users.order_by(models.User.username).limit(limit + 1).cte("user_page")
+
+    conditions = [models.Response.user_id.in_(select(page.c.id))]
+    if questionnaire_id is not None:
+        conditions.append(models.Response.questionnaire_id == questionnaire_id)
+    conditions.extend(_created_between(dialect_name, created_from, created_to))
+    answered, questions, completed = response_completion(*conditions)
+    return (
+        select(
+            page.c.username,
+            func.count(models.Response.id).label("response_count"),
+            func.coalesce(func.sum(completed), 0).label("questionnaires_completed"),
+            func.max(models.Response.created_at).label("last_submission_at"),
+        )
+        .select_from(page)
+        .outerjoin(models.Response, and_(models.Response.user_id == page.c.id, *conditions[1:]))
+        .outerjoin(answered, answered.c.response_id == models.Response.id)
+        .outerjoin(questions, questions.c.questionnaire_id == models.Response.questionnaire_id)
+        .group_by(page.c.username)
+        .order_by(page.c.username)
+    )
+
+
+async def list_user_response_counts(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[tuple], Optional[str]]:
+    """Non-admin users with the same fields as their summaries, counted over
+    the matching responses only, paged by username."""
+    stmt = user_response_counts_statement(
+        db.bind.dialect.name, limit, cursor, questionnaire_id, created_from, created_to
+    )
+    rows = (await db.execute(stmt)).all()
+    return paginate(rows, limit, lambda row: (row.username,))
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    # Accepts a sync Engine or an AsyncEngine
+    engine = getattr(engine, "sync_engine", engine)
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_query_count(engine, expected: int):
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count != expected:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(f"Expected {expected} queries, got {counter.count}:\n{statements}")
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from sqlalchemy import event, text
+from .database import AsyncSessionLocal, ReplicaSessionLocal, replica_async_engine
+
+logger = logging.getLogger(__name__)
+
+# Reads go to the primary while the replica is further behind than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+REPLICA_CHECK_TIMEOUT_SECONDS = float(os.getenv("REPLICA_CHECK_TIMEOUT_SECONDS", "1"))
+
+# 0 once everything received has been replayed (an idle primary would
+# otherwise look like ever-growing lag); NULL when the server isn't a standby
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaState:
+    """Last known replica health, refreshed lazily by the requests that need it."""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self.primary_until = 0.0
+        self.reads = {"replica": 0, "primary": 0}
+        self._checking = False
+
+    def due(self) -> bool:
+        return not self._checking and time.monotonic() - self.checked_at >= REPLICA_CHECK_INTERVAL_SECONDS
+
+    async def refresh(self) -> None:
+        self._checking = True
+        try:
+            lag = await asyncio.wait_for(measure_lag(), REPLICA_CHECK_TIMEOUT_SECONDS)
+        except Exception as exc:
+            self.mark_down(exc)
+        else:
+            self.lag_seconds = lag
+            self.error = None
+            healthy = lag <= REPLICA_MAX_LAG_SECONDS
+            if healthy != self.healthy:
+                logger.info("Replica %s (lag %.1fs)", "in use" if healthy else "lagging, reading from primary", lag)
+            self.healthy = healthy
+        finally:
+            self.checked_at = time.monotonic()
+            self._checking = False
+
+    def mark_down(self, exc: BaseException) -> None:
+        if self.healthy:
+            logger.warning("Replica unavailable, reading from primary: %r", exc)
+        self.healthy = False
+        self.error = repr(exc)
+        self.checked_at = time.monotonic()
+
+    def use_replica(self) -> bool:
+        return self.healthy and time.monotonic() >= self.primary_until
+
+    def snapshot(self) -> dict:
+        return {
+            "configured": replica_async_engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": REPLICA_MAX_LAG_SECONDS,
+            "error": self.error,
+            "primary_hold_seconds": max(self.primary_until - time.monotonic(), 0.0),
+            "reads": dict(self.reads),
+        }
+
+
+replica_state = ReplicaState()
+
+
+async def measure_lag() -> float:
+    async with replica_async_engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+        lag = (await conn.execute(POSTGRES_LAG_QUERY)).scalar()
+        return float(lag or 0)
+
+
+def hold_primary(seconds: float = REPLICA_MAX_LAG_SECONDS) -> None:
+    """Route reads to the primary for a while, e.g. after catalog writes that
+    clear caches, so a lagging replica can't refill them with old rows."""
+    replica_state.primary_until = max(replica_state.primary_until, time.monotonic() + seconds)
+
+
+async def read_sessionmaker():
+    if ReplicaSessionLocal is None:
+        return AsyncSessionLocal
+    if replica_state.due():
+        await replica_state.refresh()
+    if replica_state.use_replica():
+        replica_state.reads["replica"] += 1
+        return ReplicaSessionLocal
+    replica_state.reads["primary"] += 1
+    return AsyncSessionLocal
+
+
+@asynccontextmanager
+async def read_session():
+    """Session for read-only work: the replica while it is up and caught up, else the primary."""
+    session_factory = await read_sessionmaker()
+    async with session_factory() as db:
+        yield db
+
+
+if replica_async_engine is not None:
+    @event.listens_for(replica_async_engine.sync_engine, "handle_error")
+    def _replica_disconnected(exception_context):
+        # Stop routing to the replica now rather than at the next health check
+        if exception_context.is_disconnect:
+            replica_state.mark_down(exception_context.original_exception)
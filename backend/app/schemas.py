@@ -21,6 +21,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[str] = None
 
 class QuestionnaireBase(BaseModel):
     name: str
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter_for(schema: Any) -> TypeAdapter:
+    # Building a TypeAdapter compiles a validator/serializer; do it once per schema
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, obj: Any) -> bytes:
+    """Validate ORM rows into `schema` once and serialize in pydantic-core.
+
+    Skips FastAPI's response_model pass (validate, then jsonable_encoder, then
+    json.dumps), which walks every row twice in Python.
+    """
+    adapter = adapter_for(schema)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def json_response(
+    schema: Any,
+    obj: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    return Response(
+        content=dump_json(schema, obj),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
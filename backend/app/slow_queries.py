@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from .instrumentation import current_request
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# A fingerprint's plan is captured at most once per interval
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))
+# Bounds on one entry: bulk statements expand to thousands of placeholders
+SLOW_QUERY_MAX_PARAMETERS = int(os.getenv("SLOW_QUERY_MAX_PARAMETERS", "20"))
+SLOW_QUERY_MAX_STATEMENT_CHARS = int(os.getenv("SLOW_QUERY_MAX_STATEMENT_CHARS", "2000"))
+
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LIST = re.compile(r"(\(\?(?:\.\.\.)?\))(?:\s*,\s*\(\?(?:\.\.\.)?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape with literals and bind placeholders collapsed to `?`."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    # IN lists of any length share one fingerprint
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    # So do multi-row VALUES of any batch size
+    normalized = _ROW_LIST.sub(r"\1, ...", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def truncate(text: str, limit: int = SLOW_QUERY_MAX_STATEMENT_CHARS) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}... ({len(text) - limit} more chars)"
+
+
+def collapse_types(names: List[str]) -> Any:
+    """Type names, with a repeating row written once: '["int", "str"] x 5000'."""
+    if len(names) <= SLOW_QUERY_MAX_PARAMETERS:
+        return names
+    for period in range(1, SLOW_QUERY_MAX_PARAMETERS + 1):
+        if len(names) % period == 0 and names == names[:period] * (len(names) // period):
+            return f"{json.dumps(names[:period])} x {len(names) // period}"
+    return names[:SLOW_QUERY_MAX_PARAMETERS] + [f"... {len(names) - SLOW_QUERY_MAX_PARAMETERS} more"]
+
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    # Keep only the shape: parameter values can hold patient answers
+    if executemany:
+        shape = redact_parameters(parameters[0], False) if parameters else []
+        return f"{json.dumps(shape)} x {len(parameters)}"
+    if isinstance(parameters, dict):
+        if len(parameters) > SLOW_QUERY_MAX_PARAMETERS:
+            keys = list(parameters)[:SLOW_QUERY_MAX_PARAMETERS]
+            return {key: type(parameters[key]).__name__ for key in keys} | {
+                "...": f"{len(parameters) - SLOW_QUERY_MAX_PARAMETERS} more"
+            }
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return collapse_types([type(value).__name__ for value in parameters])
+    return None
+
+
+def explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """Plan for a SELECT on the connection that ran it, without executing it again."""
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    postgres = conn.dialect.name == "postgresql"
+    # Raw DBAPI cursor: bypasses engine events, so EXPLAIN isn't counted or timed
+    cursor = conn.connection.cursor()
+    try:
+        if postgres:
+            # A failed EXPLAIN must not abort the caller's transaction
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if postgres:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        if postgres:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+    if postgres:
+        return [row[0] for row in rows]
+    # SQLite rows are (id, parent, notused, detail)
+    return [row[-1] for row in rows]
+
+
+class SlowQueryLog:
+    """Per-process aggregate of slow statements, keyed by fingerprint."""
+
+    def __init__(self, max_fingerprints: int = SLOW_QUERY_MAX_FINGERPRINTS):
+        self.max_fingerprints = max_fingerprints
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters: Any, duration_ms: float, route: str) -> dict:
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Make room by dropping the fingerprint with the least total time
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_ms"])]
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": truncate(normalized),
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": Counter(),
+                    "explain": None,
+                    "explained_at": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_ms"] = duration_ms
+            entry["last_parameters"] = parameters
+            entry["last_seen"] = time.time()
+            entry["routes"][route] += 1
+            return entry
+
+    def needs_explain(self, entry: dict) -> bool:
+        explained_at = entry["explained_at"]
+        return explained_at is None or time.time() - explained_at > SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+
+    def set_explain(self, entry: dict, plan: Optional[List[str]]) -> None:
+        with self._lock:
+            entry["explain"] = plan
+            entry["explained_at"] = time.time()
+
+    def top(self, limit: int = 20, sort: str = "total_ms") -> List[dict]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry[sort], reverse=True)[:limit]
+            return [
+                {
+                    **{key: value for key, value in entry.items() if key != "routes"},
+                    "mean_ms": entry["total_ms"] / entry["count"],
+                    "routes": dict(entry["routes"].most_common(10)),
+                }
+                for entry in entries
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def record_statement(conn, statement: str, parameters, seconds: float, executemany: bool) -> None:
+    """Statement listener (see instrumentation.statement_listeners)."""
+    duration_ms = seconds * 1000
+    if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    stats = current_request.get()
+    route = f"{stats.scope.get('method')} {stats.route}" if stats is not None else "background"
+    redacted = redact_parameters(parameters, executemany)
+    entry = slow_query_log.record(statement, redacted, duration_ms, route)
+
+    if SLOW_QUERY_EXPLAIN and not executemany and slow_query_log.needs_explain(entry):
+        try:
+            slow_query_log.set_explain(entry, explain(conn, statement, parameters))
+        except Exception:
+            logger.debug("EXPLAIN failed for %s", entry["fingerprint"], exc_info=True)
+            slow_query_log.set_explain(entry, None)
+
+    logger.warning("slow query", extra={"fields": {
+        "fingerprint": entry["fingerprint"],
+        "duration_ms": round(duration_ms, 2),
+        "route": route,
+        "statement": entry["statement"],
+        "parameters": redacted,
+    }})
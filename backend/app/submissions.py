@@ -0,0 +1,124 @@
+import uuid
+from typing import Dict, List
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import analytics, models, schemas, user_summaries
+from .database import dialect_insert
+
+
+class InvalidAnswersError(ValueError):
+    pass
+
+
+def _insert(db: AsyncSession, model):
+    return dialect_insert(db.bind.dialect.name, model)
+
+
+async def validate_answers(
+    db: AsyncSession, questionnaire_id: int, answers: List[schemas.AnswerCreate]
+) -> Dict[int, str]:
+    """Check the answers against the questionnaire; returns the types of all its questions by id."""
+    question_ids = [answer.question_id for answer in answers]
+    if len(set(question_ids)) != len(question_ids):
+        raise InvalidAnswersError("Each question may only be answered once")
+
+    # One lookup of the questionnaire's junction rows, which also tells
+    # whether the submission answers every question
+    result = await db.execute(
+        select(models.QuestionJunction.question_id, models.Question.type)
+        .join(models.Question, models.QuestionJunction.question_id == models.Question.id)
+        .where(models.QuestionJunction.questionnaire_id == questionnaire_id)
+    )
+    question_types = dict(result.all())
+    missing_ids = sorted(set(question_ids) - set(question_types))
+    if missing_ids:
+        raise InvalidAnswersError(
+            f"Questions {missing_ids} not found in questionnaire {questionnaire_id}"
+        )
+    return question_types
+
+
+async def submit_response(
+    db: AsyncSession, user_id: str, questionnaire_id: int, answers: List[schemas.AnswerCreate]
+) -> models.Response:
+    """Replace the user's response to a questionnaire in a single transaction."""
+    try:
+        question_types = await validate_answers(db, questionnaire_id, answers)
+
+        # Upsert on (user_id, questionnaire_id); an existing row keeps its id
+        new_id = str(uuid.uuid4())
+        stmt = _insert(db, models.Response).values(
+            id=new_id,
+            user_id=user_id,
+            questionnaire_id=questionnaire_id,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "questionnaire_id"],
+            set_={"created_at": func.now(), "updated_at": func.now()},
+        ).returning(models.Response.id)
+        response_id = (await db.execute(stmt)).scalar_one()
+
+        removed = []
+        if response_id != new_id:
+            await db.execute(
+                delete(models.AnswerSelection).where(models.AnswerSelection.response_id == response_id)
+            )
+            result = await db.execute(
+                delete(models.Answer)
+                .where(models.Answer.response_id == response_id)
+                .returning(models.Answer.question_id, models.Answer.value)
+            )
+            removed = result.all()
+
+        answer_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "response_id": response_id,
+                "question_id": answer.question_id,
+                "value": answer.value,
+            }
+            for answer in answers
+        ]
+        if answer_rows:
+            await db.execute(_insert(db, models.Answer), answer_rows)
+
+        selection_rows = [
+            {
+                "answer_id": row["id"],
+                "option": option,
+                "response_id": response_id,
+                "question_id": row["question_id"],
+            }
+            for row in answer_rows
+            if question_types[row["question_id"]] == "mcq"
+            for option in set(row["value"])
+        ]
+        if selection_rows:
+            await db.execute(_insert(db, models.AnswerSelection), selection_rows)
+
+        # Keep the MCQ option counts in step with the answers, same transaction
+        added = [(answer.question_id, answer.value) for answer in answers
+                 if question_types[answer.question_id] == "mcq"]
+        await analytics.apply_option_deltas(
+            db, analytics.option_deltas(questionnaire_id, added, removed)
+        )
+        replaced = response_id != new_id
+        await user_summaries.record_submission(
+            db, user_id, replaced,
+            complete=bool(question_types) and len(answers) == len(question_types),
+            was_complete=replaced and bool(question_types) and len(removed) >= len(question_types),
+        )
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    result = await db.execute(
+        select(models.Response)
+        .options(selectinload(models.Response.answers))
+        .where(models.Response.id == response_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().one()
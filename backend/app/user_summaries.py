@@ -0,0 +1,149 @@
+import argparse
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .database import dialect_insert, engine
+from .pagination import decode_cursor, keyset_filter, paginate
+from .queries import response_completion
+
+logger = logging.getLogger(__name__)
+
+# Sort name -> (column, descending); ties are broken on user id
+SUMMARY_SORTS = {
+    "username": (models.User.username, False),
+    "response_count": (models.UserResponseSummary.response_count, True),
+    "questionnaires_completed": (models.UserResponseSummary.questionnaires_completed, True),
+    "last_submission_at": (models.UserResponseSummary.last_submission_at, True),
+}
+
+
+async def record_submission(
+    db: AsyncSession, user_id: str, replaced: bool, complete: bool, was_complete: bool
+) -> None:
+    """Fold one submission into the user's summary row on the caller's transaction.
+
+    `replaced` means the user already had a response to this questionnaire, so
+    the response count stays put and only completeness can change.
+    """
+    table = models.UserResponseSummary.__table__
+    stmt = dialect_insert(db.bind.dialect.name, table).values(
+        user_id=user_id,
+        response_count=0 if replaced else 1,
+        questionnaires_completed=int(complete) - int(was_complete),
+        last_submission_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "response_count": table.c.response_count + stmt.excluded.response_count,
+            "questionnaires_completed": table.c.questionnaires_completed + stmt.excluded.questionnaires_completed,
+            "last_submission_at": stmt.excluded.last_submission_at,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def list_user_summaries(
+    db: AsyncSession, limit: int, cursor: Optional[str] = None, sort: str = "username"
+) -> Tuple[List[tuple], Optional[str]]:
+    """Non-admin users with their summaries, one page in `sort` order."""
+    summaries, users = models.UserResponseSummary, models.User
+    column, descending = SUMMARY_SORTS[sort]
+    stmt = (
+        select(
+            users.username,
+            summaries.user_id,
+            summaries.response_count,
+            summaries.questionnaires_completed,
+            summaries.last_submission_at,
+        )
+        .join(users, users.id == summaries.user_id)
+        .where(users.is_admin == False)  # Only get non-admin users
+    )
+    if sort == "last_submission_at":
+        return await _list_by_last_submission(db, stmt, limit, cursor)
+    # Usernames are unique; the other sort columns need the id as a tiebreaker
+    keys = (column,) if sort == "username" else (column, summaries.user_id)
+    if cursor:
+        stmt = stmt.where(keyset_filter(
+            db.bind.dialect.name, keys, decode_cursor(cursor, len(keys)), descending=descending
+        ))
+    stmt = stmt.order_by(*(key.desc() if descending else key for key in keys)).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    return paginate(rows, limit, lambda row: tuple(getattr(row, key.key) for key in keys))
+
+
+async def _list_by_last_submission(db: AsyncSession, stmt, limit: int, cursor: Optional[str]):
+    # Newest submission first, users who never submitted last. A plain index
+    # scan can't produce NULLS LAST, so each half is its own index-ordered
+    # query; the cursor records which half the page ended in.
+    summaries = models.UserResponseSummary
+    column = summaries.last_submission_at
+    never_submitted, last_submission_at, user_id = decode_cursor(cursor, 3) if cursor else (False, None, None)
+    rows = []
+    if not never_submitted:
+        submitted = stmt.where(column.isnot(None))
+        if cursor:
+            submitted = submitted.where(keyset_filter(
+                db.bind.dialect.name, (column, summaries.user_id), (last_submission_at, user_id)
+            ))
+        submitted = submitted.order_by(column.desc(), summaries.user_id.desc()).limit(limit + 1)
+        rows = list((await db.execute(submitted)).all())
+    if len(rows) <= limit:
+        remaining = stmt.where(column.is_(None))
+        if never_submitted:
+            remaining = remaining.where(summaries.user_id < user_id)
+        remaining = remaining.order_by(summaries.user_id.desc()).limit(limit + 1 - len(rows))
+        rows.extend((await db.execute(remaining)).all())
+    return paginate(rows, limit, lambda row: (row.last_submission_at is None, row.last_submission_at, row.user_id))
+
+
+def summary_statement():
+    """(user_id, response_count, questionnaires_completed, last_submission_at) for every user."""
+    answered, questions, completed = response_completion()
+    return (
+        select(
+            models.User.id,
+            func.count(models.Response.id),
+            func.coalesce(func.sum(completed), 0),
+            func.max(models.Response.created_at),
+        )
+        .select_from(models.User)
+        .outerjoin(models.Response, models.Response.user_id == models.User.id)
+        .outerjoin(answered, answered.c.response_id == models.Response.id)
+        .outerjoin(questions, questions.c.questionnaire_id == models.Response.questionnaire_id)
+        .group_by(models.User.id)
+    )
+
+
+def rebuild_user_summaries() -> int:
+    """Recompute user_response_summaries from responses in one transaction.
+
+    Completeness is judged against the current catalog, so this also settles
+    drift from questions added or removed since the responses were submitted.
+    Returns the number of summary rows written.
+    """
+    models.Base.metadata.create_all(bind=engine)
+
+    summaries = models.UserResponseSummary
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Same reasoning as analytics.rebuild_option_counts: concurrent
+            # submissions apply their deltas after the rebuilt rows commit
+            connection.execute(text("LOCK TABLE user_response_summaries IN EXCLUSIVE MODE"))
+        connection.execute(delete(summaries))
+        connection.execute(insert(summaries).from_select(
+            ["user_id", "response_count", "questionnaires_completed", "last_submission_at"],
+            summary_statement(),
+        ))
+        rows = connection.execute(select(func.count()).select_from(summaries)).scalar_one()
+
+    logger.info("Rebuilt %d user response summaries", rows)
+    return rows
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Rebuild the per-user response summaries from stored responses").parse_args()
+    print(f"Rebuilt {rebuild_user_summaries()} user response summaries")
@@ -0,0 +1,159 @@
+"""Seed a database with synthetic intake data for benchmarking.
+
+Run from backend/ (DATABASE_URL picks the target, e.g. a local Postgres):
+
+    DATABASE_URL=sqlite:///./benchmark.db python -m benchmarks.seed --users 1000
+
+All existing rows are replaced. Every seeded user, including the admin
+`bench-admin`, has the password BENCHMARK_PASSWORD.
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+from sqlalchemy import delete, insert
+from app import models
+from app.analytics import rebuild_option_counts
+from app.auth import get_password_hash
+from app.cache import invalidate_catalog_caches, invalidate_user_cache
+from app.database import engine
+from app.import_data import bump_catalog_version
+from app.user_summaries import rebuild_user_summaries
+
+BENCHMARK_PASSWORD = "benchmark"
+ADMIN_USERNAME = "bench-admin"
+OPTIONS_PER_QUESTION = 4
+BATCH_SIZE = 5000
+
+
+def user_name(index: int) -> str:
+    return f"bench-user-{index:06d}"
+
+
+def insert_batches(connection, table, records: Iterable[dict]) -> int:
+    written = 0
+    batch: List[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            connection.execute(insert(table), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+        written += len(batch)
+    return written
+
+
+def seed(
+    users: int = 200,
+    questionnaires: int = 10,
+    questions: int = 8,
+    responses_per_user: int = 3,
+    random_seed: int = 42,
+) -> Dict[str, int]:
+    """Replace the database contents with a synthetic, reproducible data set."""
+    rng = random.Random(random_seed)
+    responses_per_user = min(responses_per_user, questionnaires)
+    # bcrypt is deliberately slow; every user shares one hash
+    password = get_password_hash(BENCHMARK_PASSWORD)
+    now = datetime.now(timezone.utc)
+
+    models.Base.metadata.create_all(bind=engine)
+    counts = {}
+    with engine.begin() as connection:
+        for model in (models.AnswerOptionCount, models.AnswerSelection, models.Answer, models.Response,
+                      models.QuestionJunction, models.Question, models.Questionnaire,
+                      models.UserResponseSummary, models.User):
+            connection.execute(delete(model))
+
+        counts["questionnaires"] = insert_batches(connection, models.Questionnaire.__table__, (
+            {"id": questionnaire_id, "name": f"Questionnaire {questionnaire_id}"}
+            for questionnaire_id in range(1, questionnaires + 1)
+        ))
+
+        # Each questionnaire gets its own questions; even ids are MCQ, odd are free text
+        question_types = {}
+        question_records = []
+        junction_records = []
+        for questionnaire_id in range(1, questionnaires + 1):
+            for priority in range(questions):
+                question_id = (questionnaire_id - 1) * questions + priority + 1
+                question_types[question_id] = "mcq" if question_id % 2 == 0 else "input"
+                question_records.append({
+                    "id": question_id,
+                    "type": question_types[question_id],
+                    "options": [f"Option {option}" for option in range(OPTIONS_PER_QUESTION)]
+                    if question_types[question_id] == "mcq" else [],
+                    "question": f"Synthetic question {question_id}?",
+                })
+                junction_records.append({
+                    "id": question_id,
+                    "questionnaire_id": questionnaire_id,
+                    "question_id": question_id,
+                    "priority": priority,
+                })
+        counts["questions"] = insert_batches(connection, models.Question.__table__, question_records)
+        counts["question_junctions"] = insert_batches(
+            connection, models.QuestionJunction.__table__, junction_records
+        )
+        bump_catalog_version(connection)
+
+        user_records = [{"id": str(uuid.uuid4()), "username": ADMIN_USERNAME, "password": password, "is_admin": True}]
+        user_records.extend(
+            {"id": str(uuid.uuid4()), "username": user_name(index), "password": password, "is_admin": False}
+            for index in range(users)
+        )
+        counts["users"] = insert_batches(connection, models.User.__table__, user_records)
+
+        response_records, answer_records, selection_records = [], [], []
+        for user in user_records[1:]:
+            for questionnaire_id in rng.sample(range(1, questionnaires + 1), responses_per_user):
+                response_id = str(uuid.uuid4())
+                response_records.append({
+                    "id": response_id,
+                    "user_id": user["id"],
+                    "questionnaire_id": questionnaire_id,
+                    "created_at": now - timedelta(seconds=rng.randrange(90 * 24 * 3600)),
+                })
+                for priority in range(questions):
+                    question_id = (questionnaire_id - 1) * questions + priority + 1
+                    answer_id = str(uuid.uuid4())
+                    if question_types[question_id] == "mcq":
+                        value = sorted(rng.sample(
+                            [f"Option {option}" for option in range(OPTIONS_PER_QUESTION)], rng.randint(1, 2)
+                        ))
+                        selection_records.extend(
+                            {"answer_id": answer_id, "option": option,
+                             "response_id": response_id, "question_id": question_id}
+                            for option in value
+                        )
+                    else:
+                        value = [f"free text {rng.randrange(1000)}"]
+                    answer_records.append({
+                        "id": answer_id, "response_id": response_id, "question_id": question_id, "value": value,
+                    })
+        counts["responses"] = insert_batches(connection, models.Response.__table__, response_records)
+        counts["answers"] = insert_batches(connection, models.Answer.__table__, answer_records)
+        counts["answer_selections"] = insert_batches(
+            connection, models.AnswerSelection.__table__, selection_records
+        )
+
+    counts["answer_option_counts"] = rebuild_option_counts()
+    counts["user_response_summaries"] = rebuild_user_summaries()
+    invalidate_catalog_caches()
+    invalidate_user_cache()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic benchmark data")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--questionnaires", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=8, help="Questions per questionnaire")
+    parser.add_argument("--responses-per-user", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(seed(args.users, args.questionnaires, args.questions, args.responses_per_user, args.seed), indent=2))
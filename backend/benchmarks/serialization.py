@@ -0,0 +1,90 @@
+"""Microbenchmark: FastAPI response_model serialization vs app.serialization.
+
+Run from backend/:
+
+    python -m benchmarks.serialization --responses 500 --answers 10
+
+For each endpoint payload it times the stock path (response_model validation,
+then serialization, then JSONResponse rendering) against the single-pass
+TypeAdapter path used by the handlers, and checks both produce the same JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app import models, schemas, serialization
+
+
+def build_rows(responses: int, answers: int):
+    """Transient ORM objects shaped like what the handlers load."""
+    now = datetime.now(timezone.utc)
+    questions = [
+        models.Question(id=i, type="mcq", options=[f"Option {j}" for j in range(4)],
+                        question=f"Question {i}?", created_at=now)
+        for i in range(answers)
+    ]
+    response_rows = []
+    for _ in range(responses):
+        response_id = str(uuid.uuid4())
+        response_rows.append(models.Response(
+            id=response_id, user_id=str(uuid.uuid4()), questionnaire_id=1, created_at=now,
+            answers=[
+                models.Answer(id=str(uuid.uuid4()), response_id=response_id, question_id=question.id,
+                              value=["Option 1", "Option 3"], created_at=now)
+                for question in questions
+            ],
+        ))
+    questionnaires = [models.Questionnaire(id=i, name=f"Questionnaire {i}", created_at=now) for i in range(50)]
+    detail = {"id": 1, "name": "Questionnaire 1", "created_at": now, "updated_at": None, "questions": questions}
+    return {
+        "GET /admin/responses/": (List[schemas.Response], response_rows),
+        "GET /questionnaires/": (List[schemas.Questionnaire], questionnaires),
+        "GET /questionnaires/{id}": (schemas.QuestionnaireWithQuestions, detail),
+    }
+
+
+def stock_path(field, content, response_class=JSONResponse) -> bytes:
+    value = asyncio.run(serialize_response(field=field, response_content=content))
+    return response_class(value).body
+
+
+def fast_path(schema, content) -> bytes:
+    return serialization.json_response(schema, content).body
+
+
+def run(responses: int, answers: int, number: int) -> dict:
+    results = {}
+    for endpoint, (schema, content) in build_rows(responses, answers).items():
+        field = create_response_field(name=f"Response_{abs(hash(endpoint))}", type_=schema)
+        assert json.loads(stock_path(field, content)) == json.loads(fast_path(schema, content))
+        timings = {
+            "response_model+json": timeit.timeit(lambda: stock_path(field, content), number=number) / number,
+            "response_model+orjson": timeit.timeit(
+                lambda: stock_path(field, content, ORJSONResponse), number=number) / number,
+            "type_adapter": timeit.timeit(lambda: fast_path(schema, content), number=number) / number,
+        }
+        baseline = timings["response_model+json"]
+        results[endpoint] = {
+            name: {"ms": round(seconds * 1000, 3), "speedup": round(baseline / seconds, 2)}
+            for name, seconds in timings.items()
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare response serialization paths")
+    parser.add_argument("--responses", type=int, default=500, help="Rows in the response listing")
+    parser.add_argument("--answers", type=int, default=10, help="Answers per response / questions per questionnaire")
+    parser.add_argument("--number", type=int, default=20, help="Iterations per measurement")
+    args = parser.parse_args()
+    print(json.dumps(run(args.responses, args.answers, args.number), indent=2))
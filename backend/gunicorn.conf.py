@@ -0,0 +1,21 @@
+import os
+import shutil
+
+# Prometheus multiprocess mode: every worker writes its samples to this
+# directory and /metrics aggregates them. It must be set before the workers
+# import prometheus_client, and emptied on each start so stale files from
+# the previous run's workers are not counted again.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (in-flight requests)
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,95 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+# Point the app at a throwaway SQLite database and a copy of the catalog CSVs
+# before anything imports app.database or app.import_data
+TEST_DIR = tempfile.mkdtemp()
+DATA_DIR = os.path.join(TEST_DIR, "data")
+shutil.copytree(os.path.join(os.path.dirname(__file__), "..", "..", "data"), DATA_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["IMPORT_DATA_DIR"] = DATA_DIR
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Cross-worker catalog checks would add a query at arbitrary points
+os.environ["CATALOG_VERSION_CHECK_SECONDS"] = "3600"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app import auth, import_data, models
+from app.database import SessionLocal, engine
+from app.main import app
+
+PASSWORD_HASH = auth.get_password_hash("secret")
+
+
+def add_user(username: str, is_admin: bool = False) -> models.User:
+    with SessionLocal() as db:
+        user = models.User(id=str(uuid.uuid4()), username=username, password=PASSWORD_HASH, is_admin=is_admin)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+    return user
+
+
+def headers_for(user: models.User) -> dict:
+    return {"Authorization": f"Bearer {auth.create_access_token(auth.token_claims(user))}"}
+
+
+@pytest.fixture()
+def catalog(monkeypatch):
+    """A freshly imported catalog (from a per-test copy of the CSVs) and no patient data."""
+    data_dir = os.path.join(tempfile.mkdtemp(dir=TEST_DIR), "data")
+    shutil.copytree(DATA_DIR, data_dir)
+    monkeypatch.setattr(import_data, "DATA_DIR", data_dir)
+    models.Base.metadata.drop_all(bind=engine)
+    import_data.import_data()
+    # The import seeds an admin with a placeholder password; tests bring their own
+    with SessionLocal() as db:
+        db.query(models.UserResponseSummary).delete()
+        db.query(models.User).delete()
+        db.commit()
+    return data_dir
+
+
+@pytest.fixture()
+def client(catalog):
+    # Not used as a context manager: the shutdown hook would stop the job executor
+    return TestClient(app)
+
+
+@pytest.fixture()
+def admin(catalog):
+    return add_user("admin", is_admin=True)
+
+
+@pytest.fixture()
+def patient(catalog):
+    return add_user("patient")
+
+
+@pytest.fixture()
+def admin_headers(admin):
+    return headers_for(admin)
+
+
+@pytest.fixture()
+def patient_headers(patient):
+    return headers_for(patient)
+
+
+def wait_for_job(job_id: str, timeout: float = 10) -> models.ImportJob:
+    """Poll the job row (not the API: an import job replaces the users) until it finishes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with SessionLocal() as db:
+            job = db.get(models.ImportJob, job_id)
+            if job.status in ("succeeded", "failed"):
+                db.expunge(job)
+                return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
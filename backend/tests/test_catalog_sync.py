@@ -0,0 +1,73 @@
+import os
+import pandas as pd
+import pytest
+from app import models
+from app.database import SessionLocal
+from conftest import wait_for_job
+
+
+def drop_rows(catalog: str, filename: str, ids) -> None:
+    path = os.path.join(catalog, filename)
+    frame = pd.read_csv(path)
+    frame[~frame["id"].isin(ids)].to_csv(path, index=False)
+
+
+@pytest.fixture()
+def retired_questionnaire(client, patient_headers, catalog):
+    """Questionnaire 3 with its questions 5 and 6 removed from the CSVs, after a
+    patient answered question 6 of it."""
+    response = client.post("/responses/", headers=patient_headers, json={
+        "questionnaire_id": 3, "answers": [{"question_id": 6, "value": ["yes"]}],
+    })
+    assert response.status_code == 200, response.text
+    drop_rows(catalog, "questionnaire_questionnaires.csv", [3])
+    drop_rows(catalog, "questionnaire_questions.csv", [5, 6])
+    drop_rows(catalog, "questionnaire_junction.csv", [7, 8, 9])
+
+
+def catalog_ids():
+    with SessionLocal() as db:
+        return {
+            "questionnaires": sorted(row.id for row in db.query(models.Questionnaire)),
+            "questions": sorted(row.id for row in db.query(models.Question)),
+            "question_junctions": sorted(row.id for row in db.query(models.QuestionJunction)),
+        }
+
+
+@pytest.mark.usefixtures("retired_questionnaire")
+def test_dry_run_reports_blocked_deletes(client, admin_headers):
+    before = catalog_ids()
+    response = client.post("/admin/sync-catalog", headers=admin_headers, params={"dry_run": "true"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["dry_run"] is True
+    # Answered rows are kept; what nobody answered can go
+    assert (report["questionnaires"]["delete"], report["questionnaires"]["blocked"]) == ([], [3])
+    assert (report["questions"]["delete"], report["questions"]["blocked"]) == ([5], [6])
+    assert report["question_junctions"]["delete"] == [7, 8, 9]
+    assert not any(report[table][kind] for table in ("questionnaires", "questions", "question_junctions")
+                   for kind in ("insert", "update"))
+    assert report["affected_questionnaires"] == [3]
+    assert catalog_ids() == before
+
+
+@pytest.mark.usefixtures("retired_questionnaire")
+def test_sync_keeps_rows_patient_data_points_at(client, admin_headers):
+    response = client.post("/admin/sync-catalog", headers=admin_headers)
+    assert response.status_code == 202
+    job = wait_for_job(response.json()["job_id"])
+    assert job.status == "succeeded", job.error
+    assert job.result["questions"]["blocked"] == [6]
+
+    assert catalog_ids() == {
+        "questionnaires": [1, 2, 3],
+        "questions": [1, 2, 3, 4, 6],
+        "question_junctions": [1, 2, 3, 4, 5, 6],
+    }
+    # The patient's answer still resolves to its questionnaire and question
+    details = client.get("/admin/user-responses/patient", headers=admin_headers).json()
+    assert [(detail["questionnaire_name"], len(detail["answers"])) for detail in details] == [("metformin", 1)]
+
+    # Nothing left to change on a second run
+    again = client.post("/admin/sync-catalog", headers=admin_headers, params={"dry_run": "true"}).json()
+    assert again["changes"] == 0
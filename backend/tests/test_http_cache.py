@@ -0,0 +1,77 @@
+import os
+import pytest
+from app import compression
+from conftest import wait_for_job
+
+
+@pytest.fixture()
+def compress_everything(monkeypatch):
+    # The catalog payloads here are smaller than the default threshold
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+
+
+def test_catalog_revalidation(client, patient_headers):
+    response = client.get("/questionnaires/1", headers=patient_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("private, max-age=")
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        revalidated = client.get("/questionnaires/1", headers={**patient_headers, "If-None-Match": if_none_match})
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    changed = client.get("/questionnaires/1", headers={**patient_headers, "If-None-Match": '"other"'})
+    assert changed.status_code == 200
+    assert changed.json() == response.json()
+    assert client.get("/questionnaires/2", headers=patient_headers).headers["etag"] != etag
+
+
+def test_user_principal_always_revalidates(client, patient_headers):
+    response = client.get("/users/me", headers=patient_headers)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    revalidated = client.get("/users/me", headers={**patient_headers, "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.usefixtures("compress_everything")
+def test_each_encoding_has_its_own_etag(client, patient_headers):
+    identity = client.get("/questionnaires/1", headers={**patient_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    etags = {"identity": identity.headers["etag"]}
+    for encoding in compression.ENCODINGS:
+        response = client.get("/questionnaires/1", headers={**patient_headers, "Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == identity.json()  # decoded by the client
+        etags[encoding] = response.headers["etag"]
+        assert etags[encoding] == etags["identity"][:-1] + f'-{encoding}"'
+    assert len(set(etags.values())) == len(etags)
+
+    # A validator only matches the representation it was issued for
+    for encoding, etag in etags.items():
+        for requested in etags:
+            response = client.get("/questionnaires/1", headers={
+                **patient_headers, "Accept-Encoding": requested, "If-None-Match": etag,
+            })
+            assert response.status_code == (304 if requested == encoding else 200), (encoding, requested)
+
+
+def test_catalog_sync_changes_the_etag(client, admin_headers, patient_headers, catalog):
+    before = client.get("/questionnaires/", headers=patient_headers)
+    path = os.path.join(catalog, "questionnaire_questionnaires.csv")
+    with open(path) as csv_file:
+        content = csv_file.read()
+    with open(path, "w") as csv_file:
+        csv_file.write(content.replace("metformin", "metformin-er"))
+
+    response = client.post("/admin/sync-catalog", headers=admin_headers)
+    assert response.status_code == 202
+    assert wait_for_job(response.json()["job_id"]).status == "succeeded"
+
+    after = client.get("/questionnaires/", headers={**patient_headers, "If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert "metformin-er" in {questionnaire["name"] for questionnaire in after.json()}
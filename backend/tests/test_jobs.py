@@ -0,0 +1,94 @@
+import os
+import uuid
+from datetime import timedelta
+import pytest
+from app import jobs, models
+from app.database import SessionLocal
+from conftest import wait_for_job
+
+
+def add_job(status: str, worker=None, heartbeat_age: float = 0) -> str:
+    job_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(models.ImportJob(
+            id=job_id, kind="option_counts", status=status, params={}, rows_processed=0,
+            worker=worker, heartbeat_at=jobs.utcnow() - timedelta(seconds=heartbeat_age),
+        ))
+        db.commit()
+    return job_id
+
+
+def job_row(job_id: str) -> models.ImportJob:
+    with SessionLocal() as db:
+        job = db.get(models.ImportJob, job_id)
+        db.expunge(job)
+        return job
+
+
+def test_import_runs_as_a_job(client, admin_headers):
+    response = client.post("/admin/import-data", headers=admin_headers)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = wait_for_job(job_id)
+    assert job.status == "succeeded", job.error
+    assert job.result == {"questionnaires": 3, "questions": 6, "question_junctions": 9}
+    assert job.rows_processed == 18
+    assert job.worker == jobs.WORKER_ID
+    assert jobs.job_status(job)["rows_per_second"] > 0
+
+
+def test_job_endpoints(client, admin_headers, patient_headers):
+    assert client.post("/admin/import-data", headers=admin_headers, params={"mode": "merge"}).status_code == 400
+    assert client.post("/admin/import-data", headers=patient_headers).status_code == 403
+    job_id = client.post("/admin/analytics/option-counts/rebuild", headers=admin_headers).json()["job_id"]
+    wait_for_job(job_id)
+
+    status = client.get(f"/admin/jobs/{job_id}", headers=admin_headers).json()
+    assert (status["kind"], status["status"]) == ("option_counts", "succeeded")
+    assert [job["id"] for job in client.get("/admin/jobs", headers=admin_headers).json()] == [job_id]
+    assert client.get(f"/admin/jobs/{uuid.uuid4()}", headers=admin_headers).status_code == 404
+
+
+def test_failed_job_records_the_error(client, admin_headers, catalog):
+    os.remove(os.path.join(catalog, "questionnaire_junction.csv"))
+    job = wait_for_job(client.post("/admin/sync-catalog", headers=admin_headers).json()["job_id"])
+    assert job.status == "failed"
+    assert "questionnaire_junction.csv" in job.error
+
+
+def test_a_job_is_claimed_once(catalog):
+    job_id = add_job("queued")
+    assert jobs._claim(job_id)
+    assert not jobs._claim(job_id)
+    job = job_row(job_id)
+    assert (job.status, job.worker) == ("running", jobs.WORKER_ID)
+
+
+@pytest.mark.parametrize("worker, heartbeat_age, recovered", [
+    ("elsewhere:4242:1", jobs.JOB_STALE_SECONDS + 60, True),  # dead worker, stale heartbeat
+    ("elsewhere:4242:1", 0, False),  # fresh heartbeat
+    (jobs.WORKER_ID, jobs.JOB_STALE_SECONDS + 60, False),  # stale, but its worker is alive (SQLite import)
+])
+def test_recovery_requeues_only_orphaned_jobs(catalog, worker, heartbeat_age, recovered):
+    job_id = add_job("running", worker=worker, heartbeat_age=heartbeat_age)
+    assert jobs.recover_jobs() == int(recovered)
+    if recovered:
+        job = wait_for_job(job_id)
+        assert (job.status, job.worker) == ("succeeded", jobs.WORKER_ID)
+    else:
+        assert job_row(job_id).status == "running"
+
+
+def test_recovery_picks_up_queued_jobs(catalog):
+    job_id = add_job("queued")
+    assert jobs.recover_jobs() == 1
+    assert wait_for_job(job_id).status == "succeeded"
+
+
+def test_dead_local_worker_is_detected():
+    host = jobs.WORKER_ID.split(":")[0]
+    pid = os.getpid()
+    assert jobs.worker_alive(jobs.WORKER_ID)
+    assert not jobs.worker_alive(f"{host}:{pid}:0")  # pid recycled by another process
+    assert not jobs.worker_alive(None)
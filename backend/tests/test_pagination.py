@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app import models
+from app.database import SessionLocal
+from conftest import add_user
+
+# With microseconds, as Python-written timestamps are stored; server defaults
+# (CURRENT_TIMESTAMP) have none, and pagination.bind_datetime handles both
+START = datetime(2024, 1, 1, 12, 0, 0, 250000)
+
+
+@pytest.fixture()
+def responses(catalog):
+    """21 responses from 7 users; every third timestamp is shared by three responses."""
+    users = [add_user(f"user{index}") for index in range(7)]
+    rows = []
+    for index, (user, questionnaire_id) in enumerate((user, q) for user in users for q in (1, 2, 3)):
+        rows.append({
+            "id": f"r{index:02d}",
+            "user_id": user.id,
+            "questionnaire_id": questionnaire_id,
+            "created_at": START + timedelta(minutes=index // 3),
+        })
+    with SessionLocal() as db:
+        db.execute(models.Response.__table__.insert(), rows)
+        db.commit()
+    return users, rows
+
+
+def walk(client, url, headers, **params):
+    """Every row of a listing, following X-Next-Cursor, and the number of pages."""
+    rows, pages, cursor = [], 0, None
+    while True:
+        response = client.get(url, headers=headers, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return rows, pages
+
+
+def newest_first(rows):
+    return [row["id"] for row in sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)]
+
+
+def test_response_cursor_round_trip(client, admin_headers, responses):
+    _, rows = responses
+    walked, pages = walk(client, "/admin/responses/", admin_headers, limit=4)
+    assert [row["id"] for row in walked] == newest_first(rows)
+    assert pages == 6
+
+
+def test_filtered_cursor_round_trip(client, admin_headers, responses):
+    users, rows = responses
+    walked, _ = walk(client, "/admin/responses/", admin_headers, limit=2, questionnaire_id=2)
+    assert [row["id"] for row in walked] == newest_first([row for row in rows if row["questionnaire_id"] == 2])
+
+    walked, _ = walk(client, f"/admin/users/{users[3].id}/responses", admin_headers, limit=1)
+    assert [row["id"] for row in walked] == newest_first([row for row in rows if row["user_id"] == users[3].id])
+
+
+def encode(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    encode({"dt": "2024-01-01T00:00:00"}),  # not a list
+    encode([{"dt": "2024-01-01T00:00:00"}]),  # wrong size
+    encode([{"dt": "yesterday"}, "r01"]),  # bad timestamp
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),  # not JSON
+])
+def test_bad_cursor_is_rejected(client, admin_headers, responses, cursor):
+    response = client.get("/admin/responses/", headers=admin_headers, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.parametrize("sort", ["username", "response_count", "questionnaires_completed", "last_submission_at"])
+def test_user_summary_cursor_round_trip(client, admin_headers, responses, sort):
+    users, _ = responses
+    add_user("never-submitted")
+    # Ties on every sort column, so the user id tiebreaker decides the order
+    with SessionLocal() as db:
+        for index, user in enumerate(users):
+            db.execute(
+                update(models.UserResponseSummary)
+                .where(models.UserResponseSummary.user_id == user.id)
+                .values(
+                    response_count=index % 3,
+                    questionnaires_completed=index % 2,
+                    last_submission_at=START + timedelta(minutes=index % 3),
+                )
+            )
+        db.commit()
+
+    everything = client.get("/admin/user-responses", headers=admin_headers, params={"sort": sort, "limit": 100})
+    assert everything.status_code == 200
+    assert "x-next-cursor" not in everything.headers
+    walked, pages = walk(client, "/admin/user-responses", admin_headers, sort=sort, limit=2)
+    assert walked == everything.json()
+    assert len(walked) == 8 and pages == 4
+    if sort == "last_submission_at":
+        assert walked[-1]["username"] == "never-submitted"
+    elif sort != "username":
+        assert [row[sort] for row in walked] == sorted((row[sort] for row in walked), reverse=True)
+
+
+def test_user_summary_sort_is_validated(client, admin_headers, responses):
+    assert client.get("/admin/user-responses", headers=admin_headers, params={"sort": "password"}).status_code == 400
+    response = client.get(
+        "/admin/user-responses", headers=admin_headers, params={"sort": "response_count", "questionnaire_id": 1}
+    )
+    assert response.status_code == 400
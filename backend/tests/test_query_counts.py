@@ -0,0 +1,35 @@
+from app.cache import questionnaire_cache
+from app.database import async_engine
+from app.queries import assert_query_count
+
+
+def test_questionnaire_detail_query_count(client, patient_headers):
+    # Warm the principal cache and the catalog version check, then miss the payload cache
+    assert client.get("/questionnaires/", headers=patient_headers).status_code == 200
+    questionnaire_cache.clear()
+
+    with assert_query_count(async_engine, 2):
+        response = client.get("/questionnaires/1", headers=patient_headers)
+    assert response.status_code == 200
+    assert [question["id"] for question in response.json()["questions"]] == [1, 2, 4]  # priority order
+
+    # Served from the payload cache
+    with assert_query_count(async_engine, 0):
+        assert client.get("/questionnaires/1", headers=patient_headers).status_code == 200
+
+
+def test_user_details_query_count(client, admin_headers, patient_headers):
+    for questionnaire_id, question_id in ((1, 2), (2, 3), (3, 5)):
+        response = client.post("/responses/", headers=patient_headers, json={
+            "questionnaire_id": questionnaire_id,
+            "answers": [{"question_id": question_id, "value": ["text"]}],
+        })
+        assert response.status_code == 200, response.text
+
+    # Admins are re-read on every request, then user, responses and answers
+    with assert_query_count(async_engine, 1 + 3):
+        response = client.get("/admin/user-responses/patient", headers=admin_headers)
+    assert response.status_code == 200
+    assert sorted(detail["questionnaire_name"] for detail in response.json()) == [
+        "metformin", "nad-injection", "semaglutide"
+    ]
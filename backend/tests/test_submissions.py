@@ -0,0 +1,119 @@
+import pytest
+from conftest import add_user, headers_for, wait_for_job
+
+
+def submit(client, headers, questionnaire_id, answers):
+    return client.post("/responses/", headers=headers, json={
+        "questionnaire_id": questionnaire_id,
+        "answers": [{"question_id": question_id, "value": value} for question_id, value in answers.items()],
+    })
+
+
+def option_counts(client, headers, questionnaire_id):
+    response = client.get(f"/admin/analytics/questionnaires/{questionnaire_id}/option-counts", headers=headers)
+    assert response.status_code == 200
+    return {
+        question["question_id"]: {option["option"]: option["count"] for option in question["options"]}
+        for question in response.json()["questions"]
+    }
+
+
+def summaries(client, headers):
+    response = client.get("/admin/user-responses", headers=headers)
+    assert response.status_code == 200
+    return {row["username"]: row for row in response.json()}
+
+
+def test_resubmission_replaces_the_response(client, admin_headers, patient_headers):
+    first = submit(client, patient_headers, 1, {1: ["Improve blood pressure"], 2: ["first"]})
+    assert first.status_code == 200, first.text
+    second = submit(client, patient_headers, 1, {1: ["Longevity benefits"], 2: ["second"], 4: ["Noom"]})
+    assert second.status_code == 200, second.text
+
+    # Upserted on (user, questionnaire): same response, answers replaced
+    assert second.json()["id"] == first.json()["id"]
+    responses = client.get("/admin/responses/", headers=admin_headers).json()
+    assert len(responses) == 1
+    assert sorted((answer["question_id"], answer["value"]) for answer in responses[0]["answers"]) == [
+        (1, ["Longevity benefits"]), (2, ["second"]), (4, ["Noom"]),
+    ]
+
+
+def test_option_counts_follow_submissions(client, admin_headers, patient_headers):
+    other_headers = headers_for(add_user("other"))
+    submit(client, patient_headers, 1, {1: ["Improve blood pressure", "Longevity benefits"]})
+    submit(client, other_headers, 1, {1: ["Longevity benefits"], 4: ["Noom", "Found"]})
+    assert option_counts(client, admin_headers, 1) == {
+        1: {"Longevity benefits": 2, "Improve blood pressure": 1},
+        4: {"Noom": 1, "Found": 1},
+    }
+
+    # A replacement moves the counts: old selections out, new ones in
+    submit(client, patient_headers, 1, {1: ["Support lifestyle changes"], 4: ["Noom"]})
+    counts = option_counts(client, admin_headers, 1)
+    assert counts == {
+        1: {"Longevity benefits": 1, "Support lifestyle changes": 1},
+        4: {"Noom": 2, "Found": 1},
+    }
+
+    # ... and agree with a full recount from the answers
+    job_id = client.post("/admin/analytics/option-counts/rebuild", headers=admin_headers).json()["job_id"]
+    assert wait_for_job(job_id).status == "succeeded"
+    assert option_counts(client, admin_headers, 1) == counts
+
+
+@pytest.mark.parametrize("answers, detail", [
+    ({3: ["x"]}, "Questions [3] not found in questionnaire 1"),
+    ({99: ["x"]}, "Questions [99] not found in questionnaire 1"),
+])
+def test_invalid_answers_change_nothing(client, admin_headers, patient_headers, answers, detail):
+    submit(client, patient_headers, 1, {1: ["Longevity benefits"]})
+    response = submit(client, patient_headers, 1, {1: ["Improve blood pressure"], **answers})
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+    assert option_counts(client, admin_headers, 1) == {1: {"Longevity benefits": 1}}
+    assert summaries(client, admin_headers)["patient"]["response_count"] == 1
+
+
+def test_duplicate_answers_are_rejected(client, patient_headers):
+    response = client.post("/responses/", headers=patient_headers, json={
+        "questionnaire_id": 1,
+        "answers": [{"question_id": 1, "value": ["Noom"]}, {"question_id": 1, "value": ["Found"]}],
+    })
+    assert response.status_code == 400
+
+
+def test_summaries_follow_submissions(client, admin_headers, patient_headers):
+    add_user("never-submitted")
+    summary = summaries(client, admin_headers)
+    assert summary["patient"] == summary["never-submitted"] | {"username": "patient"}
+    assert summary["patient"]["response_count"] == 0
+    assert summary["patient"]["last_submission_at"] is None
+    assert "admin" not in summary
+
+    # Partial, then completed by a replacement, then a second questionnaire
+    submit(client, patient_headers, 1, {1: ["Longevity benefits"]})
+    summary = summaries(client, admin_headers)["patient"]
+    assert (summary["response_count"], summary["questionnaires_completed"]) == (1, 0)
+    submit(client, patient_headers, 1, {1: ["Longevity benefits"], 2: ["notes"], 4: ["Noom"]})
+    submit(client, patient_headers, 2, {1: ["Longevity benefits"], 2: ["notes"], 3: ["80kg"]})
+    summary = summaries(client, admin_headers)["patient"]
+    assert (summary["response_count"], summary["questionnaires_completed"]) == (2, 2)
+    assert summary["last_submission_at"] is not None
+
+    # Un-completing by replacement counts down again
+    submit(client, patient_headers, 1, {2: ["fewer answers"]})
+    summary = summaries(client, admin_headers)["patient"]
+    assert (summary["response_count"], summary["questionnaires_completed"]) == (2, 1)
+
+    # The maintained rows match a rebuild from the responses
+    before = summaries(client, admin_headers)
+    job_id = client.post("/admin/user-responses/rebuild", headers=admin_headers).json()["job_id"]
+    assert wait_for_job(job_id).status == "succeeded"
+    assert summaries(client, admin_headers) == before
+
+    # The filtered listing counts the same way, over the matching responses only
+    filtered = client.get("/admin/user-responses", headers=admin_headers, params={"questionnaire_id": 2}).json()
+    assert {row["username"]: (row["response_count"], row["questionnaires_completed"]) for row in filtered} == {
+        "never-submitted": (0, 0), "patient": (1, 1),
+    }
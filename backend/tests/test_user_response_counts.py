@@ -0,0 +1,80 @@
+import pytest
+from app import models
+from app.database import engine
+from app.queries import user_response_counts_statement
+
+
+@pytest.fixture()
+def summary_data():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(models.Questionnaire.__table__.insert(), [{"id": 1, "name": "Intake"}, {"id": 2, "name": "Follow-up"}])
+        connection.execute(models.Question.__table__.insert(), [
+            {"id": question_id, "type": "input", "question": f"Question {question_id}"} for question_id in (1, 2, 3)
+        ])
+        connection.execute(models.QuestionJunction.__table__.insert(), [
+            {"questionnaire_id": 1, "question_id": 1, "priority": 1},
+            {"questionnaire_id": 1, "question_id": 2, "priority": 2},
+            {"questionnaire_id": 2, "question_id": 3, "priority": 1},
+        ])
+        # a answers all of questionnaire 1, b half of it, c only questionnaire 2
+        add_users(connection, ["a", "b", "c"], [("a", 1, (1, 2)), ("a", 2, (3,)), ("b", 1, (1,)), ("c", 2, (3,))])
+
+
+def add_users(connection, usernames, responses):
+    connection.execute(models.User.__table__.insert(), [
+        {"id": f"u-{username}", "username": username, "is_admin": False} for username in usernames
+    ])
+    connection.execute(models.Response.__table__.insert(), [
+        {"id": f"r-{username}-{questionnaire_id}", "user_id": f"u-{username}", "questionnaire_id": questionnaire_id}
+        for username, questionnaire_id, _ in responses
+    ])
+    connection.execute(models.Answer.__table__.insert(), [
+        {"id": f"a-{username}-{question_id}", "response_id": f"r-{username}-{questionnaire_id}",
+         "question_id": question_id, "value": ["x"]}
+        for username, questionnaire_id, question_ids in responses for question_id in question_ids
+    ])
+
+
+def add_unrelated_users(count: int, offset: int = 0):
+    # Sorted after the first page, answering questionnaire 2 only
+    usernames = [f"z{index:06d}" for index in range(offset, offset + count)]
+    with engine.begin() as connection:
+        add_users(connection, usernames, [(username, 2, (3,)) for username in usernames])
+
+
+def run_counted(**filters):
+    """Rows for the first page of three users, and the SQLite VM steps it took."""
+    steps = 0
+
+    def step():
+        nonlocal steps
+        steps += 1
+        return 0
+
+    with engine.connect() as connection:
+        dbapi_connection = connection.connection.dbapi_connection
+        dbapi_connection.set_progress_handler(step, 1)
+        try:
+            rows = connection.execute(user_response_counts_statement("sqlite", 3, **filters)).all()
+        finally:
+            dbapi_connection.set_progress_handler(None, 1)
+    return [tuple(row[:3]) for row in rows], steps
+
+
+def test_filtered_counts(summary_data):
+    rows, _ = run_counted(questionnaire_id=1)
+    assert rows == [("a", 1, 1), ("b", 1, 0), ("c", 0, 0)]
+    rows, _ = run_counted()
+    assert rows == [("a", 2, 2), ("b", 1, 0), ("c", 1, 1)]
+
+
+def test_filtered_counts_scale_with_the_page_not_the_table(summary_data):
+    add_unrelated_users(200)
+    rows, steps = run_counted(questionnaire_id=1)
+    add_unrelated_users(2000, offset=200)
+    rows_after, steps_after = run_counted(questionnaire_id=1)
+    assert rows_after == rows
+    # Ten times the unrelated answers; only index depth may add a few steps
+    assert steps_after < steps * 1.2
@@ -19,13 +19,24 @@ import {
   Container,
   Box,
   Stack,
+  Button,
+  MenuItem,
+  TextField,
 } from '@mui/material';
 import LogoutButton from '@/components/LogoutButton';
+import {
+  Questionnaire,
+  UserResponseFilters,
+  UserResponseSort,
+  UserResponseSummary,
+} from '@/types/api';
 
-interface UserResponse {
-  username: string;
-  response_count: number;
-}
+const SORT_LABELS: Record<UserResponseSort, string> = {
+  username: 'Username',
+  response_count: 'Most responses',
+  questionnaires_completed: 'Most completed',
+  last_submission_at: 'Latest submission',
+};
 
 interface Answer {
   question: string;
@@ -41,7 +52,11 @@ interface ResponseDetail {
 export default function AdminPage() {
   const router = useRouter();
   const { user } = useAuthStore();
-  const [userResponses, setUserResponses] = useState<UserResponse[]>([]);
+  const [userResponses, setUserResponses] = useState<UserResponseSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoading, setIsLoading] = useState(false);
+  const [questionnaires, setQuestionnaires] = useState<Questionnaire[]>([]);
+  const [filters, setFilters] = useState<UserResponseFilters>({ sort: 'username' });
   const [selectedUser, setSelectedUser] = useState<string | null>(null);
   const [userDetails, setUserDetails] = useState<ResponseDetail[]>([]);
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -52,18 +67,41 @@ export default function AdminPage() {
       return;
     }
 
-    const fetchUserResponses = async () => {
-      try {
-        const data = await apiClient.getUserResponses();
-        setUserResponses(data);
-      } catch (error) {
-        console.error('Error fetching user responses:', error);
-      }
-    };
-
-    fetchUserResponses();
+    apiClient.getQuestionnaires()
+      .then(setQuestionnaires)
+      .catch((error) => console.error('Error fetching questionnaires:', error));
   }, [user, router]);
 
+  // A filter change starts over from the first page
+  useEffect(() => {
+    if (!user?.is_admin) {
+      return;
+    }
+    setUserResponses([]);
+    setNextCursor(null);
+    loadPage(filters);
+  }, [user, filters]);
+
+  const loadPage = async (pageFilters: UserResponseFilters, cursor?: string) => {
+    setIsLoading(true);
+    try {
+      const page = await apiClient.getUserResponsesPage(pageFilters, cursor);
+      setUserResponses((rows) => (cursor ? [...rows, ...page.items] : page.items));
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching user responses:', error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const handleQuestionnaireChange = (value: string) => {
+    // Filtered counts are only available sorted by username
+    setFilters(value
+      ? { sort: 'username', questionnaire_id: Number(value) }
+      : { sort: filters.sort });
+  };
+
   const handleRowClick = async (username: string) => {
     try {
       const data = await apiClient.getUserResponseDetails(username);
@@ -99,6 +137,37 @@ export default function AdminPage() {
             <LogoutButton />
           </Box>
 
+          <Stack direction={{ xs: 'column', sm: 'row' }} spacing={2}>
+            <TextField
+              select
+              label="Questionnaire"
+              value={filters.questionnaire_id ?? ''}
+              onChange={(event) => handleQuestionnaireChange(event.target.value)}
+              sx={{ minWidth: 240 }}
+            >
+              <MenuItem value="">All questionnaires</MenuItem>
+              {questionnaires.map((questionnaire) => (
+                <MenuItem key={questionnaire.id} value={questionnaire.id}>
+                  {questionnaire.name}
+                </MenuItem>
+              ))}
+            </TextField>
+            <TextField
+              select
+              label="Sort by"
+              value={filters.sort ?? 'username'}
+              onChange={(event) => setFilters({ sort: event.target.value as UserResponseSort })}
+              disabled={filters.questionnaire_id !== undefined}
+              sx={{ minWidth: 200 }}
+            >
+              {Object.entries(SORT_LABELS).map(([sort, label]) => (
+                <MenuItem key={sort} value={sort}>
+                  {label}
+                </MenuItem>
+              ))}
+            </TextField>
+          </Stack>
+
           <Paper 
             elevation={0} 
             sx={{ 
@@ -121,6 +190,16 @@ export default function AdminPage() {
                     >
                       Username
                     </TableCell>
+                    <TableCell 
+                      sx={{ 
+                        fontWeight: 500,
+                        color: '#2c3e50',
+                        borderBottom: '2px solid #f5f6fa',
+                        py: 2.5,
+                      }}
+                    >
+                      Responses
+                    </TableCell>
                     <TableCell 
                       sx={{ 
                         fontWeight: 500,
@@ -131,6 +210,16 @@ export default function AdminPage() {
                     >
                       Completed Questionnaires
                     </TableCell>
+                    <TableCell 
+                      sx={{ 
+                        fontWeight: 500,
+                        color: '#2c3e50',
+                        borderBottom: '2px solid #f5f6fa',
+                        py: 2.5,
+                      }}
+                    >
+                      Last Submission
+                    </TableCell>
                   </TableRow>
                 </TableHead>
                 <TableBody>
@@ -163,12 +252,44 @@ export default function AdminPage() {
                       >
                         {response.response_count}
                       </TableCell>
+                      <TableCell
+                        sx={{ 
+                          color: '#546e7a',
+                          borderBottom: '1px solid #f5f6fa',
+                          py: 2,
+                        }}
+                      >
+                        {response.questionnaires_completed}
+                      </TableCell>
+                      <TableCell
+                        sx={{ 
+                          color: '#546e7a',
+                          borderBottom: '1px solid #f5f6fa',
+                          py: 2,
+                        }}
+                      >
+                        {response.last_submission_at
+                          ? new Date(response.last_submission_at).toLocaleString()
+                          : '—'}
+                      </TableCell>
                     </TableRow>
                   ))}
                 </TableBody>
               </Table>
             </TableContainer>
           </Paper>
+
+          {nextCursor && (
+            <Box sx={{ display: 'flex', justifyContent: 'center' }}>
+              <Button
+                variant="outlined"
+                onClick={() => loadPage(filters, nextCursor)}
+                disabled={isLoading}
+              >
+                {isLoading ? 'Loading…' : 'Load more'}
+              </Button>
+            </Box>
+          )}
         </Stack>
 
         <Dialog 
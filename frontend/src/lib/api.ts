@@ -1,5 +1,15 @@
 import axios, { AxiosError } from 'axios';
-import { LoginResponse, Questionnaire, QuestionnaireWithQuestions, Response, User } from '../types/api';
+import {
+  LoginResponse,
+  Page,
+  Questionnaire,
+  QuestionnaireWithQuestions,
+  Response,
+  ResponseFilters,
+  User,
+  UserResponseFilters,
+  UserResponseSummary,
+} from '../types/api';
 
 const api = axios.create({
   baseURL: 'https://questionnaire-backend-l0bs.onrender.com',  // Updated to correct backend URL
@@ -173,22 +183,41 @@ export const submitResponse = async (
   }
 };
 
+// Admin listings are paginated: each page carries the cursor for the next one
+// in the X-Next-Cursor header, which is absent on the last page. Screens load
+// one page and fetch the next on demand, with their filters applied server-side.
+const PAGE_SIZE = 50;
+
+const getPage = async <T>(
+  url: string,
+  params: object = {},
+  cursor?: string
+): Promise<Page<T>> => {
+  const response = await api.get<T[]>(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 // Admin endpoints
-export const getAllResponses = async (): Promise<Response[]> => {
+export const getResponsesPage = async (
+  filters: ResponseFilters = {},
+  cursor?: string
+): Promise<Page<Response>> => {
   try {
-    const response = await api.get<Response[]>('/admin/responses');
-    return response.data;
+    const { user_id, ...params } = filters;
+    const url = user_id ? `/admin/users/${user_id}/responses` : '/admin/responses/';
+    return await getPage<Response>(url, params, cursor);
   } catch (error) {
     handleApiError(error);
     throw error;
   }
 };
 
-export const getUserResponses = async (userId?: string): Promise<any> => {
+export const getUserResponsesPage = async (
+  filters: UserResponseFilters = {},
+  cursor?: string
+): Promise<Page<UserResponseSummary>> => {
   try {
-    const url = userId ? `/responses/${userId}` : '/admin/user-responses';
-    const response = await api.get(url);
-    return response.data;
+    return await getPage<UserResponseSummary>('/admin/user-responses', filters, cursor);
   } catch (error) {
     handleApiError(error);
     throw error;
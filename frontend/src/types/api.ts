@@ -42,3 +42,36 @@ export interface LoginResponse {
   access_token: string;
   token_type: string;
 }
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export interface ResponseFilters {
+  user_id?: string;
+  questionnaire_id?: number;
+  created_from?: string;
+  created_to?: string;
+}
+
+export type UserResponseSort =
+  | 'username'
+  | 'response_count'
+  | 'questionnaires_completed'
+  | 'last_submission_at';
+
+// Filtered listings can only be sorted by username
+export interface UserResponseFilters {
+  sort?: UserResponseSort;
+  questionnaire_id?: number;
+  created_from?: string;
+  created_to?: string;
+}
+
+export interface UserResponseSummary {
+  username: string;
+  response_count: number;
+  questionnaires_completed: number;
+  last_submission_at: string | null;
+}